@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+""" Token-bucket rate limiting for spawned coroutines.
+
+    A TokenBucket refills at rate tokens per second up to capacity, so
+    up to capacity coroutines start at once and the rest are spread at
+    rate per second; a capacity of 1 makes it a leaky bucket with no
+    burst. Callers are served in arrival order. throttle() and the
+    rate-limited wait_n / task_wait_n plug it into the spawning
+    helpers, e.g. into the bounded streams of 5-stream_wait_n:
+
+        bucket = TokenBucket(rate=50, capacity=10)
+        bounded_as_completed((throttle(bucket, wait_random(1))
+                              for _ in range(n)), limit=100)
+
+    The bucket reads its own clock, time.monotonic by default (the
+    clock of the default event loop), so wait_time() and stats() also
+    work outside of the loop, e.g. from a metrics thread. Give it the
+    loop's clock when the loop keeps another time, as a
+    VirtualTimeEventLoop of 7-virtual_time does:
+
+        clock = VirtualClock()
+        bucket = TokenBucket(rate=50, capacity=10, clock=clock.time)
+        run(rate_limited_wait_n(1000, 1, bucket), clock)
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+wait_random = __import__('0-basic_async_syntax').wait_random
+
+
+class TokenBucket:
+    """ Async token bucket with burst capacity """
+
+    def __init__(self, rate: float, capacity: float = 1,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        """ Start full, refilling rate tokens per second of clock """
+        if rate <= 0 or capacity < 1:
+            raise ValueError("rate must be positive and capacity at least 1")
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = float(capacity)
+        self.updated = None
+        self.acquired = 0
+        self.waited = 0.0
+        self.max_wait = 0.0
+
+    def _refill(self) -> float:
+        """ Add the tokens earned since the last update, return now """
+        now = self.clock()
+        if self.updated is not None:
+            self.tokens = min(self.capacity,
+                              self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return now
+
+    def wait_time(self, tokens: float = 1) -> float:
+        """ Seconds an acquire(tokens) made now would wait """
+        self._refill()
+        return max(tokens - self.tokens, 0.0) / self.rate
+
+    async def acquire(self, tokens: float = 1) -> float:
+        """ Wait for tokens and return how long that took. Tokens are
+            reserved on arrival (the bucket may go into debt), which
+            keeps callers in order; a cancelled wait gives them back. """
+        if tokens > self.capacity:
+            raise ValueError("cannot acquire more than the capacity")
+        self._refill()
+        self.tokens -= tokens
+        delay = max(-self.tokens, 0.0) / self.rate
+        if delay:
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                self.tokens += tokens
+                raise
+        self.acquired += 1
+        self.waited += delay
+        self.max_wait = max(self.max_wait, delay)
+        return delay
+
+    async def __aenter__(self) -> "TokenBucket":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        pass
+
+    def stats(self) -> Dict[str, float]:
+        """ Current wait time and the waits seen so far """
+        wait_time = self.wait_time()
+        return {
+            "rate": self.rate,
+            "capacity": self.capacity,
+            "tokens": max(self.tokens, 0.0),
+            "wait_time": wait_time,
+            "acquired": self.acquired,
+            "mean_wait": self.waited / self.acquired if self.acquired
+            else 0.0,
+            "max_wait": self.max_wait,
+        }
+
+
+async def throttle(bucket: TokenBucket, aw: Awaitable) -> Any:
+    """ Await aw once bucket lets it start """
+    await bucket.acquire()
+    return await aw
+
+
+async def rate_limited_wait_n(n: int, max_delay: int,
+                              bucket: TokenBucket) -> List[float]:
+    """ wait_n starting the coroutines at the bucket's rate """
+    all_delays: List[float] = []
+    for delay in asyncio.as_completed(
+            [throttle(bucket, wait_random(max_delay)) for _ in range(n)]):
+        all_delays.append(await delay)
+    return all_delays
+
+
+async def rate_limited_task_wait_n(n: int, max_delay: int,
+                                   bucket: TokenBucket) -> List[float]:
+    """ task_wait_n starting the tasks at the bucket's rate """
+    tasks = [asyncio.create_task(throttle(bucket, wait_random(max_delay)))
+             for _ in range(n)]
+    all_delays: List[float] = []
+    for delay in asyncio.as_completed(tasks):
+        all_delays.append(await delay)
+    return all_delays
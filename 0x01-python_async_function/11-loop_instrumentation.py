@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+""" Opt-in event-loop instrumentation for the async helpers.
+
+    While installed, every task created on the loop has its coroutine
+    timed step by step, feeding log2 histograms of:
+      - delay: creation to first step (schedule-to-start),
+      - step: each step, i.e. how long the task held the loop,
+      - run: total time of all the steps of a task,
+      - completion: creation to completion.
+    A watchdog thread also pings the loop; when a ping is not answered
+    within slow_callback seconds, whatever callback blocks the loop is
+    flagged with a sample of the loop thread's stack.
+
+        async def main():
+            with LoopInstrument(slow_callback=0.05) as instrument:
+                await task_wait_n(100, 1)
+            print(instrument.report())
+"""
+import asyncio
+import collections
+import sys
+import threading
+import time
+import traceback
+from typing import Any, Callable, Dict
+
+perf_counter_ns = time.perf_counter_ns
+
+
+class Histogram:
+    """ Histogram of nanosecond durations in power-of-two buckets:
+        O(1) to record, percentiles accurate to a factor of two """
+
+    def __init__(self) -> None:
+        self.buckets = [0] * 64
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, ns: int) -> None:
+        """ Count one duration """
+        self.buckets[min(ns.bit_length(), 63)] += 1
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+
+    def percentile(self, fraction: float) -> int:
+        """ Upper bound of the bucket holding the percentile """
+        rank = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= rank:
+                return min((1 << bucket) - 1, self.max)
+        return 0
+
+    def to_dict(self) -> Dict[str, float]:
+        """ Summary of the histogram in nanoseconds """
+        return {
+            "count": self.count,
+            "mean_ns": self.total / self.count if self.count else 0.0,
+            "p50_ns": self.percentile(0.5),
+            "p95_ns": self.percentile(0.95),
+            "p99_ns": self.percentile(0.99),
+            "max_ns": self.max,
+        }
+
+
+class _TimedCoroutine:
+    """ Coroutine proxy timing each step of the wrapped coroutine """
+
+    __slots__ = ("coro", "instrument", "created", "run")
+
+    def __init__(self, coro: Any, instrument: "LoopInstrument") -> None:
+        self.coro = coro
+        self.instrument = instrument
+        self.created = perf_counter_ns()
+        self.run = None
+
+    def _step(self, method: Callable, *args) -> Any:
+        """ Run one step of the coroutine through method """
+        instrument = self.instrument
+        start = perf_counter_ns()
+        if self.run is None:
+            self.run = 0
+            instrument.delay.record(start - self.created)
+        try:
+            return method(*args)
+        except BaseException:
+            end = perf_counter_ns()
+            instrument.run.record(self.run + end - start)
+            instrument.completion.record(end - self.created)
+            raise
+        finally:
+            elapsed = perf_counter_ns() - start
+            self.run += elapsed
+            instrument.step.record(elapsed)
+
+    def send(self, value: Any) -> Any:
+        return self._step(self.coro.send, value)
+
+    def throw(self, *args) -> Any:
+        return self._step(self.coro.throw, *args)
+
+    def close(self) -> None:
+        self.coro.close()
+
+    def __await__(self) -> Any:
+        return self
+
+    def __iter__(self) -> Any:
+        return self
+
+    def __next__(self) -> Any:
+        return self.send(None)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.coro, name)
+
+
+class LoopInstrument:
+    """ Task latency histograms and slow-callback detection for one
+        event loop, installed with install() or as a context manager
+        from a coroutine running on it """
+
+    def __init__(self, slow_callback: float = 0.1,
+                 keep: int = 100) -> None:
+        """ Flag callbacks blocking the loop over slow_callback seconds,
+            keeping the last keep of them """
+        self.slow_callback = slow_callback
+        self.delay = Histogram()
+        self.step = Histogram()
+        self.run = Histogram()
+        self.completion = Histogram()
+        self.slow: collections.deque = collections.deque(maxlen=keep)
+        self.loop = None
+        self.previous_factory = None
+        self.thread_id = None
+        self.watchdog = None
+        self.stopped = threading.Event()
+        self.answered = threading.Event()
+
+    def _task_factory(self, loop: asyncio.AbstractEventLoop, coro: Any,
+                      **kwargs) -> asyncio.Future:
+        """ Create the task around a timed proxy of coro """
+        coro = _TimedCoroutine(coro, self)
+        if self.previous_factory is not None:
+            return self.previous_factory(loop, coro, **kwargs)
+        return asyncio.Task(coro, loop=loop, **kwargs)
+
+    def _watch(self) -> None:
+        """ Watchdog thread: ping the loop and sample its stack when a
+            ping is not answered in time """
+        while not self.stopped.wait(self.slow_callback):
+            self.answered.clear()
+            sent = perf_counter_ns()
+            try:
+                self.loop.call_soon_threadsafe(self.answered.set)
+            except RuntimeError:
+                return
+            if self.answered.wait(self.slow_callback):
+                continue
+            frame = sys._current_frames().get(self.thread_id)
+            stack = traceback.format_stack(frame) if frame else []
+            self.answered.wait()
+            self.slow.append({
+                "blocked_ns": perf_counter_ns() - sent,
+                "stack": stack,
+            })
+
+    def install(self, loop: asyncio.AbstractEventLoop = None) -> None:
+        """ Start instrumenting loop (the running one by default) """
+        if self.loop is not None:
+            raise RuntimeError("already installed")
+        self.loop = loop or asyncio.get_running_loop()
+        self.thread_id = threading.get_ident()
+        self.previous_factory = self.loop.get_task_factory()
+        self.loop.set_task_factory(self._task_factory)
+        self.stopped.clear()
+        self.watchdog = threading.Thread(target=self._watch, daemon=True,
+                                         name="loop-watchdog")
+        self.watchdog.start()
+
+    def uninstall(self) -> None:
+        """ Stop instrumenting; tasks already created stay timed """
+        if self.loop is None:
+            return
+        self.stopped.set()
+        self.answered.set()
+        self.watchdog.join()
+        self.loop.set_task_factory(self.previous_factory)
+        self.loop = None
+
+    def __enter__(self) -> "LoopInstrument":
+        self.install()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.uninstall()
+
+    def report(self) -> Dict[str, Any]:
+        """ Histogram summaries and the slow callbacks flagged """
+        return {
+            "delay": self.delay.to_dict(),
+            "step": self.step.to_dict(),
+            "run": self.run.to_dict(),
+            "completion": self.completion.to_dict(),
+            "slow_callbacks": list(self.slow),
+        }
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+""" Streaming variants of wait_n and task_wait_n: at most limit
+    coroutines are in flight at any time, a new one is started as soon
+    as one completes, and the delays are yielded as they arrive, so
+    memory stays O(limit) whatever n is. """
+import asyncio
+from typing import AsyncIterator, Awaitable, Iterable
+wait_random = __import__('0-basic_async_syntax').wait_random
+task_wait_random = __import__('3-tasks').task_wait_random
+
+
+async def bounded_as_completed(aws: Iterable[Awaitable],
+                               limit: int) -> AsyncIterator:
+    """ Run the awaitables of a (lazy) iterable with at most limit of
+        them in flight, yielding their results in completion order.
+        Leftover tasks are cancelled if the consumer stops early or
+        one of them fails, and the errors of the completed ones that
+        were not yielded are retrieved so that none goes unreported
+        as "never retrieved". """
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+    awaitables = iter(aws)
+    pending = set()
+    done = set()
+
+    def refill() -> None:
+        """ Start awaitables until limit of them are in flight """
+        while len(pending) < limit:
+            try:
+                pending.add(asyncio.ensure_future(next(awaitables)))
+            except StopIteration:
+                return
+
+    try:
+        refill()
+        while pending:
+            done, _ = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED)
+            pending.difference_update(done)
+            refill()
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+        for task in done:
+            if not task.cancelled():
+                task.exception()
+
+
+def stream_wait_n(n: int, max_delay: int,
+                  limit: int) -> AsyncIterator[float]:
+    """ wait_n yielding each delay as it completes """
+    return bounded_as_completed(
+        (wait_random(max_delay) for _ in range(n)), limit)
+
+
+def stream_task_wait_n(n: int, max_delay: int,
+                       limit: int) -> AsyncIterator[float]:
+    """ task_wait_n yielding each delay as it completes """
+    return bounded_as_completed(
+        (task_wait_random(max_delay) for _ in range(n)), limit)
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+""" Statistical benchmark harness for coroutine workloads.
+
+    measure_time and measure_runtime time a single run with the wall
+    clock. benchmark() instead runs a coroutine factory on one event
+    loop for some warmup rounds, then for repeated timed trials with
+    perf_counter_ns, and subtracts the loop's own overhead (the median
+    time of running an empty coroutine). It reports min, median, mean,
+    p95, p99 and max in nanoseconds as a JSON-ready dict. compare()
+    checks that dict against a stored baseline:
+
+        ./6-benchmark.py 1-concurrent_coroutines:wait_n 10 0 \\
+            --trials 50 --save baseline.json
+        ./6-benchmark.py 1-concurrent_coroutines:wait_n 10 0 \\
+            --trials 50 --baseline baseline.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import statistics
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+METRICS = ("min_ns", "median_ns", "p95_ns")
+
+
+async def _noop() -> None:
+    """ Empty coroutine timing the event loop's own overhead """
+
+
+def percentile(ordered: List[int], fraction: float) -> int:
+    """ Nearest-rank percentile of an already sorted list (also in
+        0x03's cache simulator: the project directories are run on
+        their own and do not import from each other) """
+    if not ordered:
+        return 0
+    rank = max(math.ceil(fraction * len(ordered)) - 1, 0)
+    return ordered[rank]
+
+
+def time_runs(loop: asyncio.AbstractEventLoop,
+              factory: Callable[[], Awaitable], rounds: int) -> List[int]:
+    """ Run a fresh coroutine of factory rounds times on loop and
+        return the duration of each run in nanoseconds """
+    samples = []
+    for _ in range(rounds):
+        coroutine = factory()
+        start = time.perf_counter_ns()
+        loop.run_until_complete(coroutine)
+        samples.append(time.perf_counter_ns() - start)
+    return samples
+
+
+def summarize(samples: List[int]) -> Dict[str, float]:
+    """ Order statistics of a list of durations """
+    ordered = sorted(samples)
+    return {
+        "min_ns": ordered[0],
+        "median_ns": statistics.median(ordered),
+        "mean_ns": statistics.fmean(ordered),
+        "p95_ns": percentile(ordered, 0.95),
+        "p99_ns": percentile(ordered, 0.99),
+        "max_ns": ordered[-1],
+        "stdev_ns": statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+    }
+
+
+def benchmark(factory: Callable[[], Awaitable], trials: int = 30,
+              warmup: int = 3, name: str = None) -> Dict[str, Any]:
+    """ Benchmark the coroutines made by factory (called with no
+        argument once per run), net of the event loop overhead """
+    if trials < 1:
+        raise ValueError("trials must be at least 1")
+    loop = asyncio.new_event_loop()
+    try:
+        time_runs(loop, _noop, warmup)
+        overhead = statistics.median(time_runs(loop, _noop, trials))
+        time_runs(loop, factory, warmup)
+        samples = time_runs(loop, factory, trials)
+        loop.run_until_complete(loop.shutdown_asyncgens())
+    finally:
+        loop.close()
+    result = {
+        "name": name or getattr(factory, "__name__", repr(factory)),
+        "trials": trials,
+        "warmup": warmup,
+        "overhead_ns": overhead,
+    }
+    result.update(summarize([max(sample - overhead, 0)
+                             for sample in samples]))
+    return result
+
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any],
+            tolerance: float = 0.1) -> Dict[str, Dict[str, float]]:
+    """ Return the metrics of result more than tolerance (a fraction)
+        slower than in baseline, with both values and their ratio """
+    regressions = {}
+    for metric in METRICS:
+        before, after = baseline.get(metric), result.get(metric)
+        if not before or after is None:
+            continue
+        ratio = after / before
+        if ratio > 1 + tolerance:
+            regressions[metric] = {"baseline": before, "current": after,
+                                   "ratio": ratio}
+    return regressions
+
+
+def _number(text: str) -> Any:
+    """ Parse a workload argument as an int, a float or a string """
+    for kind in (int, float):
+        try:
+            return kind(text)
+        except ValueError:
+            pass
+    return text
+
+
+def main(argv: List[str] = None) -> int:
+    """ Benchmark module:function(*args), print the result as JSON and
+        return 1 if it regressed from the baseline """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("workload", help="module:coroutine_function")
+    parser.add_argument("args", nargs="*", type=_number)
+    parser.add_argument("--trials", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--baseline", help="JSON result to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    parser.add_argument("--save", help="write the result to this file")
+    args = parser.parse_args(argv)
+    module, _, function = args.workload.partition(":")
+    if not function:
+        parser.error("workload must be module:coroutine_function")
+    workload = getattr(__import__(module), function)
+    result = benchmark(lambda: workload(*args.args), args.trials,
+                       args.warmup, args.workload)
+    status = 0
+    if args.baseline:
+        with open(args.baseline) as stored:
+            regressions = compare(result, json.load(stored), args.tolerance)
+        result["regressions"] = regressions
+        status = 1 if regressions else 0
+    if args.save:
+        with open(args.save, "w") as stored:
+            json.dump(result, stored, indent=2)
+    json.dump(result, sys.stdout)
+    sys.stdout.write("\n")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
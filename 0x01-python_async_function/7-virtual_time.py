@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+""" Virtual time for the wait_random based workloads.
+
+    asyncio.sleep and loop.time() both go through the running event
+    loop, so the loop is where the clock is injected: a
+    VirtualTimeEventLoop reads a VirtualClock, and whenever it would
+    block waiting for its next timer it moves the clock forward to that
+    timer instead. Timers still fire in the same order, and
+    wait_random, wait_n, task_wait_n or async_generator return the same
+    values, but a run that would sleep for hours finishes as fast as
+    its callbacks do:
+
+        delays = run(wait_n(100000, 10))
+
+    Measure such runs with now() rather than time.time(). measure_time
+    is the virtual counterpart of 2-measure_runtime.measure_time, which
+    runs its own real loop.
+"""
+import asyncio
+import selectors
+from typing import Any, Awaitable
+wait_n = __import__('1-concurrent_coroutines').wait_n
+
+
+class VirtualClock:
+    """ A clock that only moves when told to """
+
+    def __init__(self, start: float = 0.0) -> None:
+        """ Start the clock at start seconds """
+        self.now = start
+
+    def time(self) -> float:
+        """ Current virtual time in seconds """
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        """ Move the clock forward """
+        if seconds < 0:
+            raise ValueError("a clock cannot go backwards")
+        self.now += seconds
+
+
+class _VirtualSelector(selectors.DefaultSelector):
+    """ Selector polling instead of blocking, advancing the clock by
+        the time it would have waited when nothing is ready """
+
+    def __init__(self, clock: VirtualClock) -> None:
+        super().__init__()
+        self.clock = clock
+
+    def select(self, timeout: float = None) -> list:
+        """ Poll, then jump to the next timer if nothing is ready """
+        if timeout is None:
+            # No timer is scheduled: only another thread can wake us.
+            return super().select(None)
+        events = super().select(0)
+        if not events and timeout > 0:
+            self.clock.advance(timeout)
+        return events
+
+
+class VirtualTimeEventLoop(asyncio.SelectorEventLoop):
+    """ Event loop whose time() is a VirtualClock that jumps forward
+        instead of sleeping until the next timer """
+
+    def __init__(self, clock: VirtualClock = None) -> None:
+        """ Run on clock, or on a new one starting at 0 """
+        self.clock = clock or VirtualClock()
+        super().__init__(_VirtualSelector(self.clock))
+
+    def time(self) -> float:
+        """ Current virtual time in seconds """
+        return self.clock.time()
+
+
+def run(main: Awaitable, clock: VirtualClock = None) -> Any:
+    """ asyncio.run on a fresh VirtualTimeEventLoop """
+    loop = VirtualTimeEventLoop(clock)
+    try:
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(main)
+    finally:
+        try:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+
+
+def now() -> float:
+    """ Time of the running loop, virtual or not; use it instead of
+        time.time() to measure a workload that may run virtually """
+    return asyncio.get_running_loop().time()
+
+
+def measure_time(n: int, max_delay: int,
+                 clock: VirtualClock = None) -> float:
+    """ measure_time of 2-measure_runtime in virtual seconds: the
+        virtual time wait_n(n, max_delay) takes, divided by n """
+    clock = clock or VirtualClock()
+    start = clock.time()
+    run(wait_n(n, max_delay), clock)
+    return (clock.time() - start) / n
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+""" Hedged, deadline-aware variant of task_wait_n.
+
+    Each of the n calls runs in its own task. A call still running
+    after hedge_after seconds (e.g. the observed p95, see
+    hedge_threshold) gets a backup attempt: whichever copy finishes
+    first wins and the other is cancelled. Calls still running at the
+    overall deadline are cancelled and reported as late. """
+import asyncio
+from typing import Awaitable, Callable, List, NamedTuple, Optional, Tuple
+wait_random = __import__('0-basic_async_syntax').wait_random
+percentile = __import__('6-benchmark').percentile
+
+
+class Outcome(NamedTuple):
+    """ What became of one call: its delay (None if late), the loop
+        time it took, whether it was hedged and whether it was late """
+    delay: Optional[float]
+    elapsed: float
+    hedged: bool
+    late: bool
+
+
+def hedge_threshold(delays: List[float], fraction: float = 0.95) -> float:
+    """ Hedge threshold from observed delays, their p95 by default """
+    return percentile(sorted(delays), fraction)
+
+
+async def hedged(attempt: Callable[[], Awaitable],
+                 hedge_after: Optional[float]) -> Tuple[float, bool]:
+    """ Await attempt(), starting a backup attempt() if it is still
+        running after hedge_after seconds. Return the result of the
+        first copy to succeed and whether a backup was started. """
+    running = {asyncio.ensure_future(attempt())}
+    try:
+        done, _ = await asyncio.wait(running, timeout=hedge_after)
+        backup = not done
+        if backup:
+            running.add(asyncio.ensure_future(attempt()))
+        while True:
+            done, running = await asyncio.wait(
+                running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if running and task.exception() is not None:
+                    continue
+                return task.result(), backup
+    finally:
+        for task in running:
+            task.cancel()
+
+
+async def hedged_task_wait_n(n: int, max_delay: int, deadline: float,
+                             hedge_after: Optional[float] = None
+                             ) -> List[Outcome]:
+    """ task_wait_n with hedging and an overall deadline in seconds.
+        Outcomes come in completion order, the late ones last. """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    tasks = {asyncio.create_task(hedged(lambda: wait_random(max_delay),
+                                        hedge_after)) for _ in range(n)}
+    outcomes: List[Outcome] = []
+    try:
+        while tasks:
+            remaining = start + deadline - loop.time()
+            if remaining <= 0:
+                break
+            done, tasks = await asyncio.wait(
+                tasks, timeout=remaining,
+                return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                delay, backup = task.result()
+                outcomes.append(Outcome(delay, loop.time() - start,
+                                        backup, False))
+    finally:
+        for task in tasks:
+            task.cancel()
+    elapsed = loop.time() - start
+    outcomes.extend(Outcome(None, elapsed, hedge_after is not None and
+                            elapsed >= hedge_after, True) for _ in tasks)
+    return outcomes
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+""" Run wait_n / async_comprehension workloads on several cores.
+
+    The n coroutines are split across worker processes, each running
+    its own event loop. Every worker streams its float results back
+    over a pipe as raw doubles (no pickling), batching the results that
+    complete in the same loop iteration, and the parent yields them in
+    the order they arrive from any worker.
+
+    A handler applied to each result runs in the workers, which is
+    where CPU-heavy per-result work belongs:
+
+        for delay in sharded(wait_n_stream, 100000, 10, processes=4):
+            ...
+"""
+import array
+import asyncio
+import multiprocessing
+import pickle
+from multiprocessing.connection import Connection, wait
+from typing import AsyncIterator, Callable, Iterator, List
+wait_random = __import__('0-basic_async_syntax').wait_random
+
+DATA = b"d"
+END = b"e"
+ERROR = b"x"
+
+
+async def wait_n_stream(n: int, max_delay: int) -> AsyncIterator[float]:
+    """ wait_n yielding each delay as it completes """
+    for delay in asyncio.as_completed(
+            [wait_random(max_delay) for _ in range(n)]):
+        yield await delay
+
+
+async def comprehension_stream(n: int) -> AsyncIterator[float]:
+    """ n concurrent async_comprehension runs yielding their numbers as
+        each run completes (0x02-python_async_comprehension must be on
+        sys.path) """
+    async_comprehension = __import__(
+        '1-async_comprehension').async_comprehension
+    for numbers in asyncio.as_completed(
+            [async_comprehension() for _ in range(n)]):
+        for number in await numbers:
+            yield number
+
+
+async def _drain(conn: Connection, workload: Callable, count: int,
+                 args: tuple, handler: Callable) -> None:
+    """ Stream the results of workload(count, *args) to conn, flushing
+        once per loop iteration """
+    loop = asyncio.get_running_loop()
+    batch = array.array('d')
+
+    def flush() -> None:
+        conn.send_bytes(DATA + batch.tobytes())
+        del batch[:]
+
+    async for result in workload(count, *args):
+        if not batch:
+            loop.call_soon(flush)
+        batch.append(handler(result) if handler else result)
+    if batch:
+        flush()
+
+
+def _worker(conn: Connection, workload: Callable, count: int, args: tuple,
+            handler: Callable) -> None:
+    """ Process entry point: run one shard on a fresh event loop """
+    try:
+        asyncio.run(_drain(conn, workload, count, args, handler))
+    except BaseException as error:
+        conn.send_bytes(ERROR + pickle.dumps(error))
+    else:
+        conn.send_bytes(END)
+    finally:
+        conn.close()
+
+
+def sharded(workload: Callable, n: int, *args, processes: int = None,
+            handler: Callable[[float], float] = None) -> Iterator[float]:
+    """ Split workload(n, *args), an async generator function of floats,
+        into workload(share, *args) shards run by processes workers
+        (one per CPU by default), yielding results as they arrive.
+        A failing shard stops every worker and its error is raised. """
+    processes = max(1, min(processes or multiprocessing.cpu_count(), n))
+    workers, conns = [], []
+    try:
+        for index in range(processes):
+            count = n // processes + (index < n % processes)
+            receiver, sender = multiprocessing.Pipe(duplex=False)
+            worker = multiprocessing.Process(
+                target=_worker, daemon=True,
+                args=(sender, workload, count, args, handler))
+            worker.start()
+            sender.close()
+            workers.append(worker)
+            conns.append(receiver)
+        running = list(conns)
+        while running:
+            for conn in wait(running):
+                message = conn.recv_bytes()
+                kind = message[:1]
+                if kind == DATA:
+                    yield from memoryview(message)[1:].cast('d')
+                elif kind == END:
+                    running.remove(conn)
+                else:
+                    raise pickle.loads(message[1:])
+    finally:
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+            worker.join()
+        for conn in conns:
+            conn.close()
+
+
+def sharded_wait_n(n: int, max_delay: int,
+                   processes: int = None) -> List[float]:
+    """ wait_n over processes event loops, in completion order """
+    return list(sharded(wait_n_stream, n, max_delay, processes=processes))
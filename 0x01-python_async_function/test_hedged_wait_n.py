@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""A module for testing the hedged task_wait_n.
+"""
+import asyncio
+import random
+import unittest
+from typing import List
+
+virtual_time = __import__('7-virtual_time')
+hedged_module = __import__('8-hedged_wait_n')
+hedged = hedged_module.hedged
+hedged_task_wait_n = hedged_module.hedged_task_wait_n
+hedge_threshold = hedged_module.hedge_threshold
+
+
+class Attempts:
+    """Attempts sleeping for the given delays in turn, recording when
+    each started and whether it was cancelled."""
+    def __init__(self, *delays: float) -> None:
+        self.delays = list(delays)
+        self.started: List[float] = []
+        self.cancelled: List[int] = []
+
+    async def __call__(self) -> float:
+        number = len(self.started)
+        self.started.append(virtual_time.now())
+        try:
+            await asyncio.sleep(self.delays[number])
+        except asyncio.CancelledError:
+            self.cancelled.append(number)
+            raise
+        return self.delays[number]
+
+
+class TestHedged(unittest.TestCase):
+    """Tests the `hedged` function."""
+    def hedge(self, attempts: Attempts, hedge_after: float):
+        """Runs `hedged` to completion, then lets cancellations land,
+        returning its result and when it came."""
+        async def main():
+            result = await hedged(attempts, hedge_after)
+            finished = virtual_time.now()
+            await asyncio.sleep(100)
+            return result, finished
+
+        return virtual_time.run(main())
+
+    def test_fast_call(self) -> None:
+        """Tests that a call faster than hedge_after is not hedged."""
+        attempts = Attempts(1, 1)
+        self.assertEqual(self.hedge(attempts, 2), ((1, False), 1))
+        self.assertEqual(attempts.started, [0])
+
+    def test_backup_wins(self) -> None:
+        """Tests that a slow call gets one backup, which wins and
+        cancels the first attempt."""
+        attempts = Attempts(5, 1, 1)
+        self.assertEqual(self.hedge(attempts, 2), ((1, True), 3))
+        self.assertEqual(attempts.started, [0, 2])
+        self.assertEqual(attempts.cancelled, [0])
+
+    def test_first_attempt_wins(self) -> None:
+        """Tests that the backup is cancelled when the first attempt
+        finishes before it."""
+        attempts = Attempts(2.5, 5)
+        self.assertEqual(self.hedge(attempts, 2), ((2.5, True), 2.5))
+        self.assertEqual(attempts.started, [0, 2])
+        self.assertEqual(attempts.cancelled, [1])
+
+    def test_failed_attempt(self) -> None:
+        """Tests that a failing copy leaves the other one to finish."""
+        async def attempt() -> float:
+            if not calls:
+                calls.append(virtual_time.now())
+                await asyncio.sleep(3)
+                raise ConnectionError("first attempt failed")
+            calls.append(virtual_time.now())
+            await asyncio.sleep(4)
+            return 4
+
+        calls: List[float] = []
+        self.assertEqual(self.hedge(attempt, 1), ((4, True), 5))
+        self.assertEqual(calls, [0, 1])
+
+
+class TestHedgedTaskWaitN(unittest.TestCase):
+    """Tests the `hedged_task_wait_n` function."""
+    def test_deadline(self) -> None:
+        """Tests that calls running at the deadline are cancelled and
+        come back late, after the others in completion order."""
+        random.seed(3)
+        delays = [random.uniform(0, 10) for _ in range(50)]
+        random.seed(3)
+
+        async def main():
+            outcomes = await hedged_task_wait_n(50, 10, 5)
+            for _ in range(3):
+                await asyncio.sleep(0)
+            pending = asyncio.all_tasks() - {asyncio.current_task()}
+            return outcomes, pending, virtual_time.now()
+
+        outcomes, pending, finished = virtual_time.run(main())
+        on_time = sorted(delay for delay in delays if delay < 5)
+        self.assertEqual([outcome.delay for outcome in outcomes
+                          if not outcome.late], on_time)
+        for outcome in outcomes[:len(on_time)]:
+            self.assertAlmostEqual(outcome.elapsed, outcome.delay)
+            self.assertFalse(outcome.hedged)
+        late = outcomes[len(on_time):]
+        self.assertEqual(len(late), 50 - len(on_time))
+        for outcome in late:
+            self.assertEqual(outcome, (None, 5, False, True))
+        self.assertEqual(pending, set())
+        self.assertEqual(finished, 5)
+
+    def test_hedging(self) -> None:
+        """Tests that a call slower than hedge_after returns the first
+        of its two copies to finish."""
+        random.seed(4)
+        first, backup = random.uniform(0, 10), random.uniform(0, 10)
+        self.assertGreater(first, 0.5)
+        random.seed(4)
+        outcome, = virtual_time.run(hedged_task_wait_n(1, 10, 20, 0.5))
+        self.assertTrue(outcome.hedged)
+        self.assertFalse(outcome.late)
+        self.assertEqual(outcome.delay,
+                         first if first < 0.5 + backup else backup)
+        self.assertAlmostEqual(outcome.elapsed, min(first, 0.5 + backup))
+
+    def test_hedge_threshold(self) -> None:
+        """Tests that the threshold is the p95 of the delays."""
+        self.assertEqual(hedge_threshold(list(range(100, 0, -1))), 95)
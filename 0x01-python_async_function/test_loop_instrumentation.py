@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""A module for testing the event-loop instrumentation.
+"""
+import asyncio
+import time
+import unittest
+
+instrumentation = __import__('11-loop_instrumentation')
+Histogram = instrumentation.Histogram
+LoopInstrument = instrumentation.LoopInstrument
+task_wait_n = __import__('4-tasks').task_wait_n
+
+
+def block_the_loop() -> None:
+    """Holds the loop with a blocking sleep."""
+    time.sleep(0.3)
+
+
+class TestLoopInstrument(unittest.TestCase):
+    """Tests the `LoopInstrument` class."""
+    def test_task_histograms(self) -> None:
+        """Tests that every task of task_wait_n is timed."""
+        async def main() -> LoopInstrument:
+            with LoopInstrument(slow_callback=1) as instrument:
+                await task_wait_n(20, 0.01)
+            return instrument
+
+        report = asyncio.run(main()).report()
+        for name in ("delay", "run", "completion"):
+            self.assertEqual(report[name]["count"], 20)
+        self.assertGreaterEqual(report["step"]["count"], 40)
+        self.assertGreaterEqual(report["completion"]["max_ns"],
+                                report["run"]["max_ns"])
+        self.assertEqual(report["slow_callbacks"], [])
+
+    def test_slow_callback(self) -> None:
+        """Tests that a callback blocking the loop longer than
+        slow_callback is reported with its stack."""
+        async def blocker() -> None:
+            block_the_loop()
+
+        async def main() -> LoopInstrument:
+            with LoopInstrument(slow_callback=0.05) as instrument:
+                await asyncio.sleep(0.1)
+                await asyncio.create_task(blocker())
+                await asyncio.sleep(0.1)
+            return instrument
+
+        slow = asyncio.run(main()).report()["slow_callbacks"]
+        self.assertEqual(len(slow), 1)
+        self.assertGreaterEqual(slow[0]["blocked_ns"], 50000000)
+        self.assertTrue(any("block_the_loop" in line
+                            for line in slow[0]["stack"]))
+
+    def test_uninstall(self) -> None:
+        """Tests that tasks created after uninstall are not timed."""
+        async def main() -> LoopInstrument:
+            instrument = LoopInstrument()
+            instrument.install()
+            instrument.uninstall()
+            await task_wait_n(5, 0)
+            return instrument
+
+        self.assertEqual(asyncio.run(main()).report()["run"]["count"], 0)
+
+
+class TestHistogram(unittest.TestCase):
+    """Tests the `Histogram` class."""
+    def test_percentiles(self) -> None:
+        """Tests that percentiles are bucket upper bounds."""
+        histogram = Histogram()
+        for ns in range(1, 101):
+            histogram.record(ns)
+        summary = histogram.to_dict()
+        self.assertEqual(summary["count"], 100)
+        self.assertEqual(summary["mean_ns"], 50.5)
+        self.assertEqual(summary["p50_ns"], 63)
+        self.assertEqual(summary["p99_ns"], 100)
+        self.assertEqual(summary["max_ns"], 100)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""A module for testing the token-bucket rate limiter.
+"""
+import asyncio
+import unittest
+from typing import List
+
+virtual_time = __import__('7-virtual_time')
+TokenBucket = __import__('10-rate_limiter').TokenBucket
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Tests the `TokenBucket` class."""
+    def setUp(self) -> None:
+        """Sets up a virtual clock shared by the loop and the bucket."""
+        self.clock = virtual_time.VirtualClock()
+        self.bucket = TokenBucket(rate=2, capacity=3, clock=self.clock.time)
+
+    def run_virtual(self, main):
+        """Runs `main` on a virtual loop reading the bucket's clock."""
+        return virtual_time.run(main, self.clock)
+
+    def acquire_times(self, count: int) -> List[float]:
+        """Returns when each of `count` concurrent acquires returned."""
+        async def acquire() -> float:
+            await self.bucket.acquire()
+            return virtual_time.now()
+
+        async def main() -> List[float]:
+            return await asyncio.gather(*(acquire() for _ in range(count)))
+
+        return self.run_virtual(main())
+
+    def test_burst(self) -> None:
+        """Tests that up to capacity acquires do not wait."""
+        self.assertEqual(self.acquire_times(3), [0.0, 0.0, 0.0])
+
+    def test_steady_rate(self) -> None:
+        """Tests that acquires past the burst are spread at the rate."""
+        self.assertEqual(self.acquire_times(6),
+                         [0.0, 0.0, 0.0, 0.5, 1.0, 1.5])
+
+    def test_arrival_order(self) -> None:
+        """Tests that callers are served in the order they arrived."""
+        served = []
+
+        async def acquire(number: int) -> None:
+            await self.bucket.acquire()
+            served.append(number)
+
+        async def main() -> None:
+            tasks = []
+            for number in range(8):
+                tasks.append(asyncio.create_task(acquire(number)))
+                await asyncio.sleep(0.1)
+            await asyncio.gather(*tasks)
+
+        self.run_virtual(main())
+        self.assertEqual(served, list(range(8)))
+
+    def test_refund_on_cancel(self) -> None:
+        """Tests that a cancelled acquire gives its token back."""
+        bucket = TokenBucket(rate=1, capacity=1, clock=self.clock.time)
+
+        async def main() -> float:
+            await bucket.acquire()
+            waiting = asyncio.create_task(bucket.acquire())
+            await asyncio.sleep(0.1)
+            waiting.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await waiting
+            return bucket.wait_time()
+
+        self.assertAlmostEqual(self.run_virtual(main()), 0.9)
+        self.assertEqual(bucket.acquired, 1)
+
+    def test_stats(self) -> None:
+        """Tests the counters, read once the loop is gone."""
+        self.acquire_times(5)
+        self.clock.advance(10)
+        stats = self.bucket.stats()
+        self.assertEqual(stats["acquired"], 5)
+        self.assertEqual(stats["max_wait"], 1.0)
+        self.assertAlmostEqual(stats["mean_wait"], 0.3)
+        self.assertEqual(stats["tokens"], 3)
+        self.assertEqual(stats["wait_time"], 0.0)
+
+    def test_default_clock(self) -> None:
+        """Tests that the default clock is the default loop's, and that
+        stats() works from sync code."""
+        bucket = TokenBucket(rate=1000, capacity=2)
+
+        async def main() -> None:
+            for _ in range(3):
+                await bucket.acquire()
+
+        asyncio.run(main())
+        stats = bucket.stats()
+        self.assertEqual(stats["acquired"], 3)
+        self.assertLess(stats["max_wait"], 0.01)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""A module for testing the sharded wait_n.
+"""
+import asyncio
+import multiprocessing
+import os
+import time
+import unittest
+from typing import AsyncIterator
+
+from parameterized import parameterized
+
+sharded_module = __import__('9-sharded_wait_n')
+sharded = sharded_module.sharded
+sharded_wait_n = sharded_module.sharded_wait_n
+
+
+async def shard_size(n: int) -> AsyncIterator[float]:
+    """Yields the number of coroutines of the shard."""
+    yield float(n)
+
+
+async def countdown(n: int, step: float) -> AsyncIterator[float]:
+    """Yields n after n steps."""
+    await asyncio.sleep(n * step)
+    yield float(n)
+
+
+async def fail_one(n: int) -> AsyncIterator[float]:
+    """Fails in a shard of one coroutine, hangs in the others."""
+    if n == 1:
+        raise ValueError("shard failed")
+    await asyncio.sleep(60)
+    yield float(n)
+
+
+def worker_pid(result: float) -> float:
+    """Replaces a result by the pid of the process handling it."""
+    return float(os.getpid())
+
+
+class TestSharded(unittest.TestCase):
+    """Tests the `sharded` function."""
+    @parameterized.expand([
+        (10, 3, [3, 3, 4]),
+        (8, 4, [2, 2, 2, 2]),
+        (2, 4, [1, 1]),
+        (0, 4, [0]),
+    ])
+    def test_split(self, n: int, processes: int, sizes: list) -> None:
+        """Tests how the coroutines are split between the workers."""
+        self.assertEqual(sorted(sharded(shard_size, n,
+                                        processes=processes)), sizes)
+
+    def test_completion_order(self) -> None:
+        """Tests that results come in the order they complete, from
+        any worker."""
+        self.assertEqual(list(sharded(countdown, 3, 0.3, processes=2)),
+                         [1.0, 2.0])
+
+    def test_handler_in_workers(self) -> None:
+        """Tests that the handler runs in the worker processes."""
+        pids = set(sharded(sharded_module.wait_n_stream, 40, 0,
+                           processes=4, handler=worker_pid))
+        self.assertEqual(len(pids), 4)
+        self.assertNotIn(float(os.getpid()), pids)
+
+    def test_failing_shard(self) -> None:
+        """Tests that a failing shard raises in the parent and stops
+        the other workers."""
+        start = time.monotonic()
+        with self.assertRaises(ValueError):
+            list(sharded(fail_one, 3, processes=2))
+        self.assertLess(time.monotonic() - start, 30)
+        self.assertEqual(multiprocessing.active_children(), [])
+
+    def test_sharded_wait_n(self) -> None:
+        """Tests that every delay comes back."""
+        self.assertEqual(sharded_wait_n(20, 0, processes=4), [0.0] * 20)
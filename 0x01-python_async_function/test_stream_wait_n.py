@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""A module for testing the streaming wait_n and task_wait_n.
+"""
+import asyncio
+import gc
+import random
+import unittest
+from typing import List
+
+virtual_time = __import__('7-virtual_time')
+stream_module = __import__('5-stream_wait_n')
+bounded_as_completed = stream_module.bounded_as_completed
+stream_wait_n = stream_module.stream_wait_n
+stream_task_wait_n = stream_module.stream_task_wait_n
+
+
+class Tracker:
+    """Coroutines sleeping for given delays, tracking how many run at
+    once and how many were started or cancelled."""
+    def __init__(self) -> None:
+        self.running = 0
+        self.peak = 0
+        self.started = 0
+        self.cancelled = 0
+
+    async def sleep(self, delay: float) -> float:
+        """Sleeps for `delay`, keeping count."""
+        self.started += 1
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.running -= 1
+        return delay
+
+
+class TestBoundedAsCompleted(unittest.TestCase):
+    """Tests the `bounded_as_completed` function."""
+    def test_limit(self) -> None:
+        """Tests that at most limit awaitables are in flight and that
+        the iterable is consumed lazily."""
+        tracker = Tracker()
+        delays = [(7 * number) % 10 + 1 for number in range(50)]
+
+        async def main() -> List[float]:
+            results = []
+            async for delay in bounded_as_completed(
+                    (tracker.sleep(delay) for delay in delays), 5):
+                self.assertLessEqual(tracker.started, len(results) + 5)
+                results.append(delay)
+            return results
+
+        self.assertEqual(sorted(virtual_time.run(main())), sorted(delays))
+        self.assertEqual(tracker.peak, 5)
+
+    def test_completion_order(self) -> None:
+        """Tests that the delays come in completion order."""
+        random.seed(5)
+        expected = sorted(random.uniform(0, 10) for _ in range(200))
+        random.seed(5)
+
+        async def main() -> List[float]:
+            return [delay async for delay in stream_task_wait_n(200, 10,
+                                                                200)]
+
+        self.assertEqual(virtual_time.run(main()), expected)
+
+    def test_early_stop(self) -> None:
+        """Tests that the awaitables in flight are cancelled when the
+        consumer stops early."""
+        tracker = Tracker()
+
+        async def main() -> set:
+            results = bounded_as_completed(
+                (tracker.sleep(1 + number % 4) for number in range(100)), 8)
+            async for _ in results:
+                break
+            await results.aclose()
+            await asyncio.sleep(0)
+            return asyncio.all_tasks() - {asyncio.current_task()}
+
+        self.assertEqual(virtual_time.run(main()), set())
+        self.assertEqual(tracker.running, 0)
+        self.assertEqual(tracker.started - tracker.cancelled, 2)
+
+    def test_failures_retrieved(self) -> None:
+        """Tests that a failure is raised and that the other failures
+        completing with it are not reported as never retrieved."""
+        async def fail(number: int) -> None:
+            await asyncio.sleep(1)
+            raise ValueError(number)
+
+        async def main() -> List[dict]:
+            unretrieved = []
+            asyncio.get_running_loop().set_exception_handler(
+                lambda loop, context: unretrieved.append(context))
+            with self.assertRaises(ValueError):
+                async for _ in bounded_as_completed(
+                        (fail(number) for number in range(4)), 4):
+                    pass
+            gc.collect()
+            return unretrieved
+
+        self.assertEqual(virtual_time.run(main()), [])
+
+    def test_limit_check(self) -> None:
+        """Tests that the limit must be positive."""
+        async def main() -> None:
+            async for _ in stream_wait_n(1, 0, 0):
+                pass
+
+        with self.assertRaises(ValueError):
+            virtual_time.run(main())
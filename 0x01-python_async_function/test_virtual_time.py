@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""A module for testing the virtual-time event loop.
+"""
+import asyncio
+import importlib.util
+import os
+import random
+import sys
+import unittest
+
+COMPREHENSIONS = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                              "..", "0x02-python_async_comprehension")
+sys.path.append(COMPREHENSIONS)
+virtual_time = __import__('7-virtual_time')
+wait_n = __import__('1-concurrent_coroutines').wait_n
+task_wait_n = __import__('4-tasks').task_wait_n
+# Both projects have a 2-measure_runtime module: load that one by path.
+_spec = importlib.util.spec_from_file_location(
+    "comprehension_measure_runtime",
+    os.path.join(COMPREHENSIONS, "2-measure_runtime.py"))
+_module = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_module)
+measure_runtime = _module.measure_runtime
+
+
+class TestVirtualTime(unittest.TestCase):
+    """Tests the `7-virtual_time` module."""
+    def test_wait_n(self) -> None:
+        """Tests that a large wait_n returns the delays a real loop
+        would, in order, after as much virtual time as its longest."""
+        random.seed(0)
+        expected = [random.uniform(0, 10) for _ in range(100000)]
+        random.seed(0)
+        clock = virtual_time.VirtualClock()
+        delays = virtual_time.run(wait_n(100000, 10), clock)
+        self.assertEqual(delays, sorted(expected))
+        self.assertAlmostEqual(clock.time(), max(expected))
+
+    def test_same_as_real_loop(self) -> None:
+        """Tests that the virtual and the real loop agree."""
+        random.seed(1)
+        real = asyncio.run(task_wait_n(20, 0.05))
+        random.seed(1)
+        self.assertEqual(virtual_time.run(task_wait_n(20, 0.05)), real)
+
+    def test_now(self) -> None:
+        """Tests that now() reads the virtual clock."""
+        async def main() -> float:
+            start = virtual_time.now()
+            await asyncio.sleep(3600)
+            return virtual_time.now() - start
+
+        self.assertEqual(virtual_time.run(main()), 3600)
+
+    def test_measure_time(self) -> None:
+        """Tests that measure_time reports virtual seconds."""
+        random.seed(2)
+        longest = max(random.uniform(0, 10) for _ in range(1000))
+        random.seed(2)
+        self.assertAlmostEqual(virtual_time.measure_time(1000, 10),
+                               longest / 1000)
+
+    def test_measure_runtime(self) -> None:
+        """Tests that measure_runtime of the async comprehension tasks
+        measures virtual time."""
+        self.assertAlmostEqual(virtual_time.run(measure_runtime()), 10)
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Defines streaming combinators for async generators such as
+async_generator, so values are handled as soon as they exist:
+
+    async for number in take(merge(*(async_generator()
+                                     for _ in range(4))), 20):
+        ...
+
+Every combinator closes the iterators it consumes when it stops early.
+"""
+import asyncio
+from typing import (AsyncIterable, AsyncIterator, Awaitable, Callable,
+                    Dict, Iterable, List, TypeVar)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+async def _close(iterator: AsyncIterator) -> None:
+    """
+    Close an async iterator if it supports it.
+    """
+    aclose = getattr(iterator, "aclose", None)
+    if aclose is not None:
+        await aclose()
+
+
+async def _cancel(tasks: Iterable[asyncio.Future]) -> None:
+    """
+    Cancel tasks and wait until they are done.
+    """
+    tasks = list(tasks)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def merge(*sources: AsyncIterable[T]) -> AsyncIterator[T]:
+    """
+    Interleave several async iterables, yielding each value as soon
+    as any of them produces it.
+    """
+    iterators = [source.__aiter__() for source in sources]
+    pending: Dict[asyncio.Future, AsyncIterator[T]] = {
+        asyncio.ensure_future(iterator.__anext__()): iterator
+        for iterator in iterators}
+    try:
+        while pending:
+            done, _ = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                iterator = pending.pop(task)
+                try:
+                    value = task.result()
+                except StopAsyncIteration:
+                    continue
+                pending[asyncio.ensure_future(iterator.__anext__())] = \
+                    iterator
+                yield value
+    finally:
+        await _cancel(pending)
+        for iterator in iterators:
+            await _close(iterator)
+
+
+async def map_concurrent(func: Callable[[T], Awaitable[R]],
+                         source: AsyncIterable[T],
+                         limit: int) -> AsyncIterator[R]:
+    """
+    Apply the coroutine function func to every value of source with at
+    most limit calls in flight, yielding results in completion order.
+    The next value of source is awaited alongside the calls, so a
+    result is yielded as soon as it is ready, even while refilling.
+    """
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+    iterator = source.__aiter__()
+    calls = set()
+    following = None
+    exhausted = False
+    try:
+        while True:
+            if following is None and not exhausted and len(calls) < limit:
+                following = asyncio.ensure_future(iterator.__anext__())
+            waiting = calls if following is None else calls | {following}
+            if not waiting:
+                return
+            done, _ = await asyncio.wait(
+                waiting, return_when=asyncio.FIRST_COMPLETED)
+            if following in done:
+                done.discard(following)
+                try:
+                    value = following.result()
+                except StopAsyncIteration:
+                    exhausted = True
+                else:
+                    calls.add(asyncio.ensure_future(func(value)))
+                following = None
+            calls -= done
+            for call in done:
+                yield call.result()
+    finally:
+        if following is not None:
+            calls.add(following)
+        await _cancel(calls)
+        await _close(iterator)
+
+
+async def batch(source: AsyncIterable[T], size: int,
+                timeout: float = None) -> AsyncIterator[List[T]]:
+    """
+    Group the values of source into lists of size values, yielding a
+    shorter list when timeout seconds passed since its first value
+    arrived, and the leftover values when source ends.
+    """
+    if size < 1:
+        raise ValueError("size must be at least 1")
+    loop = asyncio.get_running_loop()
+    iterator = source.__aiter__()
+    following = None
+    chunk: List[T] = []
+    due = None
+    try:
+        while True:
+            if following is None:
+                following = asyncio.ensure_future(iterator.__anext__())
+            wait = None if due is None else max(due - loop.time(), 0)
+            done, _ = await asyncio.wait({following}, timeout=wait)
+            if done:
+                following = None
+                try:
+                    value = done.pop().result()
+                except StopAsyncIteration:
+                    break
+                if not chunk:
+                    due = None if timeout is None else loop.time() + timeout
+                chunk.append(value)
+                if len(chunk) < size:
+                    continue
+            yield chunk
+            chunk, due = [], None
+        if chunk:
+            yield chunk
+    finally:
+        if following is not None:
+            await _cancel([following])
+        await _close(iterator)
+
+
+async def take(source: AsyncIterable[T], n: int) -> AsyncIterator[T]:
+    """
+    Yield the first n values of source, then close it.
+    """
+    iterator = source.__aiter__()
+    try:
+        for _ in range(n):
+            try:
+                value = await iterator.__anext__()
+            except StopAsyncIteration:
+                return
+            yield value
+    finally:
+        await _close(iterator)
+
+
+async def timeout(source: AsyncIterable[T],
+                  seconds: float) -> AsyncIterator[T]:
+    """
+    Yield the values of source, raising asyncio.TimeoutError if one
+    takes more than seconds to arrive.
+    """
+    iterator = source.__aiter__()
+    try:
+        while True:
+            try:
+                value = await asyncio.wait_for(iterator.__anext__(),
+                                               seconds)
+            except StopAsyncIteration:
+                return
+            yield value
+    finally:
+        await _close(iterator)
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Defines a backpressure-aware pipeline of asynchronous stages.
+
+Stages are connected by bounded queues: when a stage falls behind,
+its input queue fills up and the stage before it (down to the source
+generator) waits instead of buffering without limit:
+
+    pipeline = (Pipeline(async_generator(), maxsize=4)
+                .stage(parse, workers=4)
+                .stage(store, workers=2, maxsize=8))
+    async for result in pipeline:
+        ...
+    pipeline.metrics()
+"""
+import asyncio
+from typing import (Any, AsyncIterable, AsyncIterator, Awaitable, Callable,
+                    Dict, List)
+
+_DONE = object()
+
+
+class MeteredQueue(asyncio.Queue):
+    """
+    An asyncio.Queue recording its peak depth and how long producers
+    were blocked on it while it was full.
+    """
+
+    def __init__(self, maxsize: int = 0) -> None:
+        super().__init__(maxsize)
+        self.peak = 0
+        self.blocked = 0.0
+
+    async def put(self, item: Any) -> None:
+        """
+        Put an item, timing the wait if the queue is full.
+        """
+        if not self.full():
+            self.put_nowait(item)
+            return
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        try:
+            await super().put(item)
+        finally:
+            self.blocked += loop.time() - start
+
+    def put_nowait(self, item: Any) -> None:
+        """
+        Put an item without blocking, tracking the peak depth.
+        """
+        super().put_nowait(item)
+        self.peak = max(self.peak, self.qsize())
+
+
+class Stage:
+    """
+    A coroutine function run by workers tasks, reading its input from
+    a bounded queue.
+    """
+
+    def __init__(self, func: Callable[[Any], Awaitable], workers: int,
+                 maxsize: int, name: str) -> None:
+        if workers < 1 or maxsize < 1:
+            raise ValueError("workers and maxsize must be at least 1")
+        self.func = func
+        self.workers = workers
+        self.name = name
+        self.inbox = MeteredQueue(maxsize)
+        self.processed = 0
+
+
+class Pipeline:
+    """
+    Runs the values of source through a chain of stages, yielding
+    the results of the last one (in completion order when a stage has
+    several workers) through an output queue of maxsize items.
+    """
+
+    def __init__(self, source: AsyncIterable, maxsize: int = 16) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.source = source
+        self.stages: List[Stage] = []
+        self.outbox = MeteredQueue(maxsize)
+        self.error = None
+
+    def stage(self, func: Callable[[Any], Awaitable], workers: int = 1,
+              maxsize: int = 16, name: str = None) -> "Pipeline":
+        """
+        Append a stage awaiting func(value) for every value, and return
+        the pipeline for chaining.
+        """
+        self.stages.append(Stage(func, workers, maxsize,
+                                 name or getattr(func, "__name__", "stage")))
+        return self
+
+    async def _feed(self, outbox: MeteredQueue, consumers: int) -> None:
+        """
+        Move the source values into the first queue.
+        """
+        async for value in self.source:
+            await outbox.put(value)
+        for _ in range(consumers):
+            await outbox.put(_DONE)
+
+    async def _work(self, stage: Stage, outbox: MeteredQueue,
+                    consumers: int, running: List[int]) -> None:
+        """
+        Worker loop of a stage; the last worker of a stage to finish
+        tells the consumers of the next queue to stop.
+        """
+        while True:
+            value = await stage.inbox.get()
+            if value is _DONE:
+                running[0] -= 1
+                if not running[0]:
+                    for _ in range(consumers):
+                        await outbox.put(_DONE)
+                return
+            await outbox.put(await stage.func(value))
+            stage.processed += 1
+
+    def _landed(self, task: asyncio.Task) -> None:
+        """
+        Record the first failure of a pipeline task and wake the
+        consumer if it waits on an empty output queue.
+        """
+        if task.cancelled() or task.exception() is None:
+            return
+        if self.error is None:
+            self.error = task.exception()
+            try:
+                self.outbox.put_nowait(_DONE)
+            except asyncio.QueueFull:
+                pass
+
+    async def __aiter__(self) -> AsyncIterator:
+        """
+        Start the stages and yield the results; an error in the source
+        or a stage stops every task and is raised here.
+        """
+        if not self.stages:
+            raise ValueError("a pipeline needs at least one stage")
+        tasks = [asyncio.ensure_future(self._feed(self.stages[0].inbox,
+                                                  self.stages[0].workers))]
+        for index, stage in enumerate(self.stages):
+            if index + 1 < len(self.stages):
+                outbox = self.stages[index + 1].inbox
+                consumers = self.stages[index + 1].workers
+            else:
+                outbox, consumers = self.outbox, 1
+            running = [stage.workers]
+            tasks.extend(
+                asyncio.ensure_future(
+                    self._work(stage, outbox, consumers, running))
+                for _ in range(stage.workers))
+        for task in tasks:
+            task.add_done_callback(self._landed)
+        try:
+            while self.error is None:
+                value = await self.outbox.get()
+                if value is _DONE:
+                    break
+                yield value
+            if self.error is not None:
+                raise self.error
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            aclose = getattr(self.source, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    def metrics(self) -> List[Dict[str, Any]]:
+        """
+        Depth, capacity, peak depth and producer blocked time of every
+        queue, with the stage reading it and its throughput.
+        """
+        metrics = [{
+            "stage": stage.name,
+            "workers": stage.workers,
+            "processed": stage.processed,
+            "depth": stage.inbox.qsize(),
+            "maxsize": stage.inbox.maxsize,
+            "peak": stage.inbox.peak,
+            "blocked_seconds": stage.inbox.blocked,
+        } for stage in self.stages]
+        metrics.append({
+            "stage": "output",
+            "depth": self.outbox.qsize(),
+            "maxsize": self.outbox.maxsize,
+            "peak": self.outbox.peak,
+            "blocked_seconds": self.outbox.blocked,
+        })
+        return metrics
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""A module for testing the pipeline of async stages.
+"""
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "0x01-python_async_function"))
+virtual_time = __import__('7-virtual_time')
+Pipeline = __import__('4-pipeline').Pipeline
+
+
+class Source:
+    """An async iterable of numbers, recording how many it produced
+    and whether it was closed."""
+    def __init__(self, count: int) -> None:
+        self.count = count
+        self.produced = 0
+        self.closed = False
+
+    async def __aiter__(self):
+        try:
+            for number in range(self.count):
+                self.produced += 1
+                yield number
+        finally:
+            self.closed = True
+
+
+def pending_tasks() -> set:
+    """Returns the tasks of the running loop other than this one."""
+    return asyncio.all_tasks() - {asyncio.current_task()}
+
+
+class TestPipeline(unittest.TestCase):
+    """Tests the `Pipeline` class."""
+    def test_results(self) -> None:
+        """Tests that every value goes through every stage."""
+        async def double(value: int) -> int:
+            await asyncio.sleep(value % 3)
+            return value * 2
+
+        async def increment(value: int) -> int:
+            return value + 1
+
+        async def main() -> tuple:
+            pipeline = (Pipeline(Source(20).__aiter__(), maxsize=4)
+                        .stage(double, workers=3)
+                        .stage(increment, maxsize=2))
+            return [value async for value in pipeline], pipeline.metrics()
+
+        results, metrics = virtual_time.run(main())
+        self.assertEqual(sorted(results), [n * 2 + 1 for n in range(20)])
+        self.assertEqual([stage["processed"] for stage in metrics[:2]],
+                         [20, 20])
+        self.assertEqual([stage["stage"] for stage in metrics],
+                         ["double", "increment", "output"])
+        self.assertTrue(all(stage["depth"] == 0 for stage in metrics))
+
+    def test_backpressure(self) -> None:
+        """Tests that a fast source waits for a slow stage instead of
+        filling the queues."""
+        source = Source(50)
+        ahead = []
+
+        async def slow(value: int) -> int:
+            ahead.append(source.produced - value)
+            await asyncio.sleep(1)
+            return value
+
+        async def main() -> tuple:
+            pipeline = Pipeline(source.__aiter__(), maxsize=2).stage(
+                slow, maxsize=3)
+            return [value async for value in pipeline], pipeline.metrics()
+
+        results, metrics = virtual_time.run(main())
+        self.assertEqual(results, list(range(50)))
+        self.assertLessEqual(max(ahead), 5)
+        self.assertEqual(metrics[0]["peak"], 3)
+        self.assertGreater(metrics[0]["blocked_seconds"], 40)
+
+    def test_stage_error(self) -> None:
+        """Tests that an error in a stage reaches the consumer, stops
+        every task and closes the source."""
+        source = Source(1000)
+
+        async def check(value: int) -> int:
+            await asyncio.sleep(1)
+            if value == 3:
+                raise ValueError("bad value")
+            return value
+
+        async def main() -> tuple:
+            results = []
+            with self.assertRaises(ValueError):
+                async for value in Pipeline(source.__aiter__()).stage(
+                        check, workers=2):
+                    results.append(value)
+            return results, pending_tasks()
+
+        results, pending = virtual_time.run(main())
+        self.assertNotIn(3, results)
+        self.assertEqual(pending, set())
+        self.assertTrue(source.closed)
+
+    def test_early_break(self) -> None:
+        """Tests that closing the results after a break cancels the
+        stages and closes the source."""
+        source = Source(1000)
+
+        async def identity(value: int) -> int:
+            await asyncio.sleep(1)
+            return value
+
+        async def main() -> tuple:
+            results = Pipeline(source.__aiter__()).stage(
+                identity, workers=4).__aiter__()
+            async for value in results:
+                if value == 5:
+                    break
+            await results.aclose()
+            return pending_tasks(), virtual_time.now()
+
+        pending, finished = virtual_time.run(main())
+        self.assertEqual(pending, set())
+        self.assertTrue(source.closed)
+        self.assertLess(source.produced, 100)
+        self.assertLess(finished, 5)
+
+    def test_no_stage(self) -> None:
+        """Tests that a pipeline needs a stage."""
+        async def main() -> None:
+            async for _ in Pipeline(Source(1).__aiter__()):
+                pass
+
+        with self.assertRaises(ValueError):
+            virtual_time.run(main())
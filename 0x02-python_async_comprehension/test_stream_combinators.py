@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""A module for testing the stream combinators.
+"""
+import asyncio
+import os
+import sys
+import unittest
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "0x01-python_async_function"))
+virtual_time = __import__('7-virtual_time')
+async_generator = __import__('0-async_generator').async_generator
+map_concurrent = __import__('3-stream_combinators').map_concurrent
+
+
+async def double(value: float) -> float:
+    """Doubles `value` after a short delay."""
+    await asyncio.sleep(0.01)
+    return value * 2
+
+
+class TestMapConcurrent(unittest.TestCase):
+    """Tests the `map_concurrent` function."""
+    def test_results_while_refilling(self) -> None:
+        """Tests that each result is yielded when its call ends, not
+        once the calls in flight were refilled."""
+        async def main() -> List[float]:
+            return [virtual_time.now() async for _ in
+                    map_concurrent(double, async_generator(), 4)]
+
+        times = virtual_time.run(main())
+        self.assertEqual(len(times), 10)
+        for index, time in enumerate(times, 1):
+            self.assertAlmostEqual(time, index + 0.01)
+
+    def test_limit(self) -> None:
+        """Tests that at most `limit` calls run at once."""
+        running, peak = [0], [0]
+
+        async def slow(value: int) -> int:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+            await asyncio.sleep(1)
+            running[0] -= 1
+            return value
+
+        async def numbers():
+            for number in range(10):
+                yield number
+
+        async def main() -> List[int]:
+            return [value async for value in map_concurrent(slow,
+                                                            numbers(), 3)]
+
+        self.assertEqual(sorted(virtual_time.run(main())), list(range(10)))
+        self.assertEqual(peak[0], 3)
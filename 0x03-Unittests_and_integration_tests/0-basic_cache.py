@@ -12,15 +12,20 @@ class BasicCache(BaseCaching):
        and is a caching system
     '''
 
-    def put(self, key, item):
+    def put(self, key, item, ttl=None):
         '''assign to the dictionary `self.cache_data` the
            `item` value for the key `key`
         '''
         if key is not None and item is not None:
-            self.cache_data[key] = item
+            self.purge_expired()
+            self._store(key, item, self._weigh(key, item), ttl)
 
     def get(self, key):
         '''return the value in `self.cache_data` linked to `key`
         '''
-
-        return self.cache_data.get(key, None)
+        item = self.cache_data.get(key)
+        if item is None or not self._alive(key):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return item
@@ -13,11 +13,11 @@ class FIFOCache(BaseCaching):
        `BaseCaching` and is a caching system.
     '''
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
         self.cache_data = OrderedDict()
 
-    def put(self, key, item):
+    def put(self, key, item, ttl=None):
         '''assign to the dictionary `self.cache_data` the
            `item` value for the key `key`
         '''
@@ -25,13 +25,21 @@ class FIFOCache(BaseCaching):
         if key is None or item is None:
             return
 
-        if len(self.cache_data) > BaseCaching.MAX_ITEMS:
-            first_key, _ = self.cache_data.popitem(last=False)
-            print(f"DISCARD: {first_key}")
-
-        self.cache_data[key] = item
+        weight = self._weigh(key, item)
+        if self._make_room(key, weight):
+            self._store(key, item, weight, ttl)
 
     def get(self, key):
         '''return the value in `self.cache_data` linked to `key`
         '''
-        return self.cache_data.get(key, None)
+        item = self.cache_data.get(key)
+        if item is None or not self._alive(key):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return item
+
+    def _victim(self, key):
+        '''the first key put in the cache
+        '''
+        return self._other_than(key, self.cache_data)
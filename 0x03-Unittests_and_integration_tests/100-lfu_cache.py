@@ -10,64 +10,103 @@ class LFUCache(BaseCaching):
     """Represents an object that allows storing and
     retrieving items from a dictionary with a LFU
     removal mechanism when the limit is reached.
+
+    Keys are grouped in frequency buckets. Each bucket is an
+    `OrderedDict` kept in recency order, so ties are broken by
+    evicting the least recently used key, and `min_freq` always
+    points at the bucket holding the next key to discard. Every
+    operation is O(1).
     """
-    def __init__(self):
+    def __init__(self, *args, **kwargs):
         """Initializes the cache.
         """
-        super().__init__()
+        super().__init__(*args, **kwargs)
         self.cache_data = OrderedDict()
-        self.keys_freq = []
+        self.keys_freq = {}
+        self.freq_keys = {}
+        self.min_freq = 0
 
-    def __reorder_items(self, mru_key):
-        """Reorders the items in this cache based on the most
-        recently used item.
+    def _hit(self, key):
+        """Moves `key` from its frequency bucket to the next one.
         """
-        max_positions = []
-        mru_freq = 0
-        mru_pos = 0
-        ins_pos = 0
-        for i, key_freq in enumerate(self.keys_freq):
-            if key_freq[0] == mru_key:
-                mru_freq = key_freq[1] + 1
-                mru_pos = i
-                break
-            elif len(max_positions) == 0:
-                max_positions.append(i)
-            elif key_freq[1] < self.keys_freq[max_positions[-1]][1]:
-                max_positions.append(i)
-        max_positions.reverse()
-        for pos in max_positions:
-            if self.keys_freq[pos][1] > mru_freq:
-                break
-            ins_pos = pos
-        self.keys_freq.pop(mru_pos)
-        self.keys_freq.insert(ins_pos, [mru_key, mru_freq])
+        freq = self.keys_freq[key]
+        bucket = self.freq_keys[freq]
+        del bucket[key]
+        if not bucket:
+            del self.freq_keys[freq]
+            if self.min_freq == freq:
+                self.min_freq = freq + 1
+        self.keys_freq[key] = freq + 1
+        self.freq_keys.setdefault(freq + 1, OrderedDict())[key] = None
 
-    def put(self, key, item):
+    def put(self, key, item, ttl=None):
         """Adds an item in the cache.
         """
         if key is None or item is None:
             return
+        weight = self._weigh(key, item)
+        if not self._make_room(key, weight):
+            return
         if key not in self.cache_data:
-            if len(self.cache_data) + 1 > BaseCaching.MAX_ITEMS:
-                lfu_key, _ = self.keys_freq[-1]
-                self.cache_data.pop(lfu_key)
-                self.keys_freq.pop()
-                print("DISCARD:", lfu_key)
-            self.cache_data[key] = item
-            ins_index = len(self.keys_freq)
-            for i, key_freq in enumerate(self.keys_freq):
-                if key_freq[1] == 0:
-                    ins_index = i
-                    break
-            self.keys_freq.insert(ins_index, [key, 0])
+            self.keys_freq[key] = 0
+            self.freq_keys.setdefault(0, OrderedDict())[key] = None
+            self.min_freq = 0
         else:
-            self.cache_data[key] = item
-            self.__reorder_items(key)
+            self._hit(key)
+        self._store(key, item, weight, ttl)
 
     def get(self, key):
         """Retrieves an item by key.
         """
-        if key is not None and key in self.cache_data:
-            self.__reorder_items(key)
-        return self.cache_data.get(key, None)
+        item = self.cache_data.get(key)
+        if item is None or not self._alive(key):
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._hit(key)
+        return item
+
+    def _policy_state(self):
+        """Returns the frequency buckets, in recency order.
+        """
+        return {
+            "buckets": [(freq, list(bucket))
+                        for freq, bucket in self.freq_keys.items()],
+            "min_freq": self.min_freq,
+        }
+
+    def _load_policy_state(self, state):
+        """Rebuilds the frequency buckets.
+        """
+        self.freq_keys = {freq: OrderedDict.fromkeys(keys)
+                          for freq, keys in state["buckets"]}
+        self.keys_freq = {key: freq
+                          for freq, keys in state["buckets"]
+                          for key in keys}
+        self.min_freq = state["min_freq"]
+
+    def _victim(self, key):
+        """Returns the least recently used key among the
+        least frequently used ones.
+        """
+        if not self.freq_keys:
+            return None
+        if self.min_freq not in self.freq_keys:
+            self.min_freq = min(self.freq_keys)
+        victim = self._other_than(key, self.freq_keys[self.min_freq])
+        if victim is None:
+            for freq in sorted(self.freq_keys):
+                victim = self._other_than(key, self.freq_keys[freq])
+                if victim is not None:
+                    break
+        return victim
+
+    def _discard(self, key, cause="evicted"):
+        """Removes an item and its frequency bookkeeping.
+        """
+        freq = self.keys_freq.pop(key)
+        bucket = self.freq_keys[freq]
+        del bucket[key]
+        if not bucket:
+            del self.freq_keys[freq]
+        super()._discard(key, cause)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Task 6: Adaptive Replacement caching module.
+"""
+from collections import OrderedDict
+
+from base_caching import BaseCaching
+
+
+class ARCCache(BaseCaching):
+    """Represents an object that allows storing and
+    retrieving items from a dictionary with an ARC
+    removal mechanism when the limit is reached.
+
+    `t1` holds keys seen once recently and `t2` keys seen at least
+    twice, both from least to most recently used. The ghost lists
+    `b1` and `b2` remember the keys recently discarded from each of
+    them, and a hit on a ghost moves the target size `p` of `t1`
+    towards the list that would have kept it. A scan only flows
+    through `t1`, so it cannot flush the frequent keys in `t2`.
+    """
+    def __init__(self, *args, **kwargs):
+        """Initializes the cache.
+        """
+        super().__init__(*args, **kwargs)
+        self.t1 = OrderedDict()
+        self.t2 = OrderedDict()
+        self.b1 = OrderedDict()
+        self.b2 = OrderedDict()
+        self.p = 0
+
+    def put(self, key, item, ttl=None):
+        """Adds an item in the cache.
+        """
+        if key is None or item is None:
+            return
+        weight = self._weigh(key, item)
+        if key in self.b1:
+            self.p = min(self.capacity,
+                         self.p + max(len(self.b2) / len(self.b1), 1))
+        elif key in self.b2:
+            self.p = max(0, self.p - max(len(self.b1) / len(self.b2), 1))
+        if not self._make_room(key, weight):
+            return
+        if key in self.t2:
+            self.t2.move_to_end(key)
+        elif key in self.t1 or key in self.b1 or key in self.b2:
+            for keys in (self.t1, self.b1, self.b2):
+                keys.pop(key, None)
+            self.t2[key] = None
+        else:
+            self.t1[key] = None
+        self._store(key, item, weight, ttl)
+        self._trim_ghosts()
+
+    def get(self, key):
+        """Retrieves an item by key.
+        """
+        item = self.cache_data.get(key)
+        if item is None or not self._alive(key):
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._hit(key)
+        return item
+
+    def _hit(self, key):
+        """Moves `key` to the most recently used end of `t2`.
+        """
+        if key in self.t1:
+            del self.t1[key]
+            self.t2[key] = None
+        else:
+            self.t2.move_to_end(key)
+
+    def _policy_state(self):
+        """Returns the four lists and the target size of `t1`.
+        """
+        return {
+            "t1": list(self.t1), "t2": list(self.t2),
+            "b1": list(self.b1), "b2": list(self.b2),
+            "p": self.p,
+        }
+
+    def _load_policy_state(self, state):
+        """Rebuilds the four lists and the target size of `t1`.
+        """
+        for name in ("t1", "t2", "b1", "b2"):
+            setattr(self, name, OrderedDict.fromkeys(state[name]))
+        self.p = state["p"]
+
+    def _trim_ghosts(self):
+        """Keeps `t1 + b1` within the capacity and the whole
+        directory within twice the capacity.
+        """
+        while self.b1 and len(self.t1) + len(self.b1) > self.capacity:
+            self.b1.popitem(last=False)
+        while self.b2 and (len(self.cache_data) + len(self.b1) +
+                           len(self.b2) > 2 * self.capacity):
+            self.b2.popitem(last=False)
+
+    def _victim(self, key):
+        """Returns the least recently used key of `t1` when it is
+        over its target size, of `t2` otherwise.
+        """
+        t1_size = len(self.t1)
+        if t1_size and (t1_size > self.p or
+                        (key in self.b2 and t1_size == self.p)):
+            order = (self.t1, self.t2)
+        else:
+            order = (self.t2, self.t1)
+        for keys in order:
+            victim = self._other_than(key, keys)
+            if victim is not None:
+                return victim
+        return None
+
+    def _discard(self, key, cause="evicted"):
+        """Removes an item, remembering evicted keys in the
+        matching ghost list.
+        """
+        if key in self.t1:
+            del self.t1[key]
+            ghosts = self.b1
+        else:
+            del self.t2[key]
+            ghosts = self.b2
+        if cause == "evicted":
+            ghosts[key] = None
+        super()._discard(key, cause)
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""Task 7: Window TinyLFU caching module.
+"""
+from collections import OrderedDict
+
+from base_caching import BaseCaching
+
+
+class CountMinSketch():
+    """Approximate access counter with 4-bit counters.
+
+    Every key is counted in one cell of each of the `depth` rows and
+    its frequency is the smallest of those cells. Once `sample_size`
+    accesses were recorded all counters are halved, so old popularity
+    fades away.
+    """
+    SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F,
+             0x165667B19E3779F9, 0x27D4EB2F165667C5)
+    MAX_COUNT = 15
+
+    def __init__(self, capacity, sample_factor=10):
+        """Initializes the sketch for about `capacity` keys.
+        """
+        width = 1
+        while width < max(capacity, 1):
+            width <<= 1
+        self.width = width
+        self.depth = len(self.SEEDS)
+        self.table = bytearray(width * self.depth)
+        self.sample_size = sample_factor * width
+        self.additions = 0
+
+    def _cells(self, key):
+        """Returns the cell of `key` in every row.
+        """
+        h = hash(key)
+        mask = self.width - 1
+        return [row * self.width + (((h ^ seed) * seed >> 32) & mask)
+                for row, seed in enumerate(self.SEEDS)]
+
+    def increment(self, key, count=1):
+        """Records `count` accesses to `key`.
+        """
+        table = self.table
+        for cell in self._cells(key):
+            if table[cell] < self.MAX_COUNT:
+                table[cell] = min(table[cell] + count, self.MAX_COUNT)
+        self.additions += count
+        if self.additions >= self.sample_size:
+            self.age()
+
+    def frequency(self, key):
+        """Returns the estimated access count of `key`.
+        """
+        return min(self.table[cell] for cell in self._cells(key))
+
+    def age(self):
+        """Halves every counter.
+        """
+        self.table = bytearray(count >> 1 for count in self.table)
+        self.additions //= 2
+
+
+class WTinyLFUCache(BaseCaching):
+    """Represents an object that allows storing and
+    retrieving items from a dictionary with a W-TinyLFU
+    removal mechanism when the limit is reached.
+
+    New keys enter a small LRU `window`. A key pushed out of the
+    window only joins the main segmented LRU if the sketch has seen
+    it more often than the main victim; the main area is split in a
+    `probation` segment and a `protected` one for keys hit while on
+    probation. Every segment is ordered from least to most recently
+    used.
+    """
+    WINDOW_RATIO = 0.01
+    PROTECTED_RATIO = 0.8
+
+    def __init__(self, *args, **kwargs):
+        """Initializes the cache.
+        """
+        super().__init__(*args, **kwargs)
+        self.window_size = max(1, int(self.capacity * self.WINDOW_RATIO))
+        main_size = max(0, self.capacity - self.window_size)
+        self.protected_size = int(main_size * self.PROTECTED_RATIO)
+        self.window = OrderedDict()
+        self.probation = OrderedDict()
+        self.protected = OrderedDict()
+        self.sketch = CountMinSketch(self.capacity)
+
+    def put(self, key, item, ttl=None):
+        """Adds an item in the cache.
+        """
+        if key is None or item is None:
+            return
+        self.sketch.increment(key)
+        weight = self._weigh(key, item)
+        if not self._make_room(key, weight):
+            return
+        if key in self.cache_data:
+            self._hit(key)
+        else:
+            self.window[key] = None
+            while len(self.window) > self.window_size:
+                overflow, _ = self.window.popitem(last=False)
+                self.probation[overflow] = None
+        self._store(key, item, weight, ttl)
+
+    def get(self, key):
+        """Retrieves an item by key.
+        """
+        if key is not None:
+            self.sketch.increment(key)
+        item = self.cache_data.get(key)
+        if item is None or not self._alive(key):
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._hit(key)
+        return item
+
+    def get_many(self, keys):
+        """Retrieves the items of `keys`, in the same order.
+        """
+        keys = list(keys)
+        increment = self.sketch.increment
+        for key in keys:
+            if key is not None:
+                increment(key)
+        return super().get_many(keys)
+
+    def _hit(self, key):
+        """Marks `key` as used, promoting it out of probation.
+        """
+        if key in self.window:
+            self.window.move_to_end(key)
+        elif key in self.protected:
+            self.protected.move_to_end(key)
+        else:
+            del self.probation[key]
+            self.protected[key] = None
+            while len(self.protected) > self.protected_size:
+                demoted, _ = self.protected.popitem(last=False)
+                self.probation[demoted] = None
+
+    def _policy_state(self):
+        """Returns the segments and the estimated frequency of the
+        cached keys.
+
+        The sketch itself is not saved: string hashes change from one
+        process to the next.
+        """
+        return {
+            "window": list(self.window),
+            "probation": list(self.probation),
+            "protected": list(self.protected),
+            "frequencies": [(key, self.sketch.frequency(key))
+                            for key in self.cache_data],
+        }
+
+    def _load_policy_state(self, state):
+        """Rebuilds the segments and replays the frequencies of the
+        cached keys into a fresh sketch.
+
+        Keys are replayed from the least to the most frequent, each
+        only topped up to its saved count, so keys sharing cells do
+        not add up their counts.
+        """
+        for name in ("window", "probation", "protected"):
+            setattr(self, name, OrderedDict.fromkeys(state[name]))
+        self.sketch = CountMinSketch(self.capacity)
+        for key, count in sorted(state["frequencies"],
+                                 key=lambda pair: pair[1]):
+            missing = count - self.sketch.frequency(key)
+            if missing > 0:
+                self.sketch.increment(key, missing)
+
+    def _victim(self, key):
+        """Returns the loser of the admission duel between the
+        window's least recently used key and the main victim.
+
+        A winning window candidate is moved to probation.
+        """
+        main_victim = self._other_than(key, self.probation)
+        if main_victim is None:
+            main_victim = self._other_than(key, self.protected)
+        candidate = None
+        if len(self.window) >= self.window_size:
+            candidate = self._other_than(key, self.window)
+        if candidate is None:
+            if main_victim is None:
+                return self._other_than(key, self.window)
+            return main_victim
+        if main_victim is None:
+            return candidate
+        if (self.sketch.frequency(candidate) >
+                self.sketch.frequency(main_victim)):
+            del self.window[candidate]
+            self.probation[candidate] = None
+            return main_victim
+        return candidate
+
+    def _discard(self, key, cause="evicted"):
+        """Removes an item from its segment.
+        """
+        for segment in (self.window, self.probation, self.protected):
+            if key in segment:
+                del segment[key]
+                break
+        super()._discard(key, cause)
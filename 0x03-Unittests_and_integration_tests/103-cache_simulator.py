@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""Task 8: Trace-driven cache simulator.
+
+Replays key traces against the caching policies and reports the hit
+ratio, throughput and per-operation latency as JSON, e.g.:
+
+    ./103-cache_simulator.py --trace zipf --capacity 100 --length 100000
+    ./103-cache_simulator.py --trace file --path keys.txt --policy LRUCache
+"""
+import argparse
+import itertools
+import json
+import math
+import random
+import sys
+import time
+from typing import Dict, Iterable, Iterator, List
+
+POLICIES = {
+    "BasicCache": __import__('0-basic_cache').BasicCache,
+    "FIFOCache": __import__('1-fifo_cache').FIFOCache,
+    "LIFOCache": __import__('2-lifo_cache').LIFOCache,
+    "LRUCache": __import__('3-lru_cache').LRUCache,
+    "MRUCache": __import__('4-mru_cache').MRUCache,
+    "LFUCache": __import__('100-lfu_cache').LFUCache,
+    "ARCCache": __import__('101-arc_cache').ARCCache,
+    "WTinyLFUCache": __import__('102-tinylfu_cache').WTinyLFUCache,
+}
+
+
+def zipf_trace(length: int, keys: int = 1000, skew: float = 1.0,
+               seed: int = 0) -> List[int]:
+    """Keys drawn with probability proportional to 1 / rank ** skew.
+    """
+    rng = random.Random(seed)
+    ranks = range(1, keys + 1)
+    weights = list(itertools.accumulate(1 / rank ** skew for rank in ranks))
+    return rng.choices(ranks, cum_weights=weights, k=length)
+
+
+def scan_trace(length: int, start: int = 0) -> List[int]:
+    """Keys that are never requested twice.
+    """
+    return list(range(start, start + length))
+
+
+def loop_trace(length: int, keys: int = 1000) -> List[int]:
+    """Keys requested cyclically.
+    """
+    return [i % keys for i in range(length)]
+
+
+def file_trace(path: str) -> Iterator[str]:
+    """Keys recorded one per line in a file.
+    """
+    with open(path) as trace:
+        for line in trace:
+            key = line.strip()
+            if key:
+                yield key
+
+
+def percentile(ordered: List[int], fraction: float) -> int:
+    """Nearest-rank percentile of an already sorted list.
+
+    The same helper lives in 0x01's 6-benchmark: each project
+    directory is run on its own and does not import from the others.
+    """
+    if not ordered:
+        return 0
+    rank = max(math.ceil(fraction * len(ordered)) - 1, 0)
+    return ordered[rank]
+
+
+def simulate(policy: str, capacity: int, trace: Iterable) -> Dict:
+    """Replay `trace` as read-through accesses on a fresh cache.
+
+    Every key is looked up and put on a miss; the latency of each
+    access (lookup plus fill) is measured with perf_counter_ns.
+    """
+    cache = POLICIES[policy](capacity)
+    get, put = cache.get, cache.put
+    clock = time.perf_counter_ns
+    latencies = []
+    record = latencies.append
+    started = clock()
+    for key in trace:
+        before = clock()
+        if get(key) is None:
+            put(key, key)
+        record(clock() - before)
+    elapsed = clock() - started
+    latencies.sort()
+    stats = cache.stats()
+    return {
+        "policy": policy,
+        "capacity": capacity,
+        "ops": len(latencies),
+        "hit_ratio": stats["hit_ratio"],
+        "evictions": stats["evictions"],
+        "ops_per_sec": len(latencies) / elapsed * 1e9 if elapsed else 0.0,
+        "p50_ns": percentile(latencies, 0.50),
+        "p99_ns": percentile(latencies, 0.99),
+    }
+
+
+def build_trace(args: argparse.Namespace) -> List:
+    """Trace selected on the command line.
+    """
+    if args.trace == "zipf":
+        return zipf_trace(args.length, args.keys, args.skew, args.seed)
+    if args.trace == "scan":
+        return scan_trace(args.length)
+    if args.trace == "loop":
+        return loop_trace(args.length, args.keys)
+    return list(file_trace(args.path))
+
+
+def main(argv: List[str] = None) -> None:
+    """Run the simulator and print one JSON object per policy.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--policy", action="append", choices=POLICIES,
+                        help="policy to run (repeatable, default: all)")
+    parser.add_argument("--capacity", type=int, default=100)
+    parser.add_argument("--trace", default="zipf",
+                        choices=("zipf", "scan", "loop", "file"))
+    parser.add_argument("--path", help="trace file, one key per line")
+    parser.add_argument("--length", type=int, default=100000)
+    parser.add_argument("--keys", type=int, default=1000)
+    parser.add_argument("--skew", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    if args.trace == "file" and not args.path:
+        parser.error("--trace file requires --path")
+    trace = build_trace(args)
+    for policy in args.policy or POLICIES:
+        result = simulate(policy, args.capacity, trace)
+        result["trace"] = args.trace
+        json.dump(result, sys.stdout)
+        sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""Task 9: Lock-striped concurrent caching module.
+"""
+import threading
+
+from base_caching import BaseCaching
+
+FIFOCache = __import__('1-fifo_cache').FIFOCache
+LIFOCache = __import__('2-lifo_cache').LIFOCache
+LRUCache = __import__('3-lru_cache').LRUCache
+MRUCache = __import__('4-mru_cache').MRUCache
+LFUCache = __import__('100-lfu_cache').LFUCache
+ARCCache = __import__('101-arc_cache').ARCCache
+WTinyLFUCache = __import__('102-tinylfu_cache').WTinyLFUCache
+
+
+class ShardedCache():
+    """A thread-safe cache splitting its keys across `shards`
+    instances of `policy`, each guarded by its own lock.
+
+    The capacity and weight budget are divided between the shards,
+    so they are enforced per shard and only approximately for the
+    whole cache. Threads working on different shards never wait on
+    each other.
+
+    Fewer shards than asked are used when the budgets are small: each
+    shard holds at least MIN_SHARD_ITEMS entries, and a weight budget
+    is split in at most MAX_WEIGHTED_SHARDS shards, so an entry of up
+    to that fraction of `max_weight` can still be cached.
+    """
+    POLICY = None
+    MIN_SHARD_ITEMS = 8
+    MAX_WEIGHTED_SHARDS = 4
+
+    def __init__(self, capacity=None, shards=16, policy=None,
+                 max_weight=None, **kwargs):
+        """Initializes the shards.
+        """
+        self.policy = policy or self.POLICY
+        self.capacity = BaseCaching.MAX_ITEMS if capacity is None \
+            else capacity
+        count = min(shards, self.capacity // self.MIN_SHARD_ITEMS)
+        shard_weight = None
+        if max_weight is not None:
+            count = min(count, self.MAX_WEIGHTED_SHARDS)
+            shard_weight = max_weight / max(1, count)
+        count = max(1, count)
+        share, extra = divmod(self.capacity, count)
+        self.shards = [
+            self.policy(capacity=share + (index < extra),
+                        max_weight=shard_weight, **kwargs)
+            for index in range(count)
+        ]
+        self.locks = [threading.Lock() for _ in range(count)]
+
+    def _shard(self, key):
+        """Returns the index of the shard holding `key`.
+        """
+        return hash(key) % len(self.shards)
+
+    def put(self, key, item, ttl=None):
+        """Adds an item in the cache.
+        """
+        if key is None or item is None:
+            return
+        index = self._shard(key)
+        with self.locks[index]:
+            self.shards[index].put(key, item, ttl)
+
+    def get(self, key):
+        """Retrieves an item by key.
+        """
+        index = self._shard(key)
+        with self.locks[index]:
+            return self.shards[index].get(key)
+
+    def delete(self, key):
+        """Removes `key`, telling whether it was cached.
+        """
+        index = self._shard(key)
+        with self.locks[index]:
+            return self.shards[index].delete(key)
+
+    def _group(self, keys):
+        """Maps each shard index to the positions of its keys.
+        """
+        groups = {}
+        for position, key in enumerate(keys):
+            groups.setdefault(self._shard(key), []).append(position)
+        return groups
+
+    def get_many(self, keys):
+        """Retrieves the items of `keys`, in the same order, taking
+        each shard's lock once.
+        """
+        keys = list(keys)
+        items = [None] * len(keys)
+        for index, positions in self._group(keys).items():
+            with self.locks[index]:
+                found = self.shards[index].get_many(
+                    [keys[position] for position in positions])
+            for position, item in zip(positions, found):
+                items[position] = item
+        return items
+
+    def put_many(self, items, ttl=None):
+        """Adds every (key, item) pair of `items` (or of a mapping),
+        taking each shard's lock once.
+        """
+        if hasattr(items, "items"):
+            items = items.items()
+        pairs = list(items)
+        groups = self._group([key for key, _ in pairs])
+        for index, positions in groups.items():
+            with self.locks[index]:
+                self.shards[index].put_many(
+                    [pairs[position] for position in positions], ttl)
+
+    def delete_many(self, keys):
+        """Removes `keys`, returning how many were cached.
+        """
+        keys = list(keys)
+        deleted = 0
+        for index, positions in self._group(keys).items():
+            with self.locks[index]:
+                deleted += self.shards[index].delete_many(
+                    [keys[position] for position in positions])
+        return deleted
+
+    def purge_expired(self):
+        """Discards the expired entries of every shard.
+        """
+        for shard, lock in zip(self.shards, self.locks):
+            with lock:
+                shard.purge_expired()
+
+    def add_listener(self, listener):
+        """Calls `listener(key, item, cause)` whenever an entry is
+        evicted or expires.
+        """
+        for shard, lock in zip(self.shards, self.locks):
+            with lock:
+                shard.add_listener(listener)
+
+    def remove_listener(self, listener):
+        """Stops calling `listener` on discards.
+        """
+        for shard, lock in zip(self.shards, self.locks):
+            with lock:
+                shard.remove_listener(listener)
+
+    def stats(self):
+        """Returns the usage counters summed over the shards.
+
+        Each shard is read under its own lock, so the snapshot is
+        consistent per shard but not across shards.
+        """
+        totals = {}
+        for shard, lock in zip(self.shards, self.locks):
+            with lock:
+                snapshot = shard.stats()
+            for name, value in snapshot.items():
+                totals[name] = totals.get(name, 0) + value
+        lookups = totals["hits"] + totals["misses"]
+        totals["hit_ratio"] = totals["hits"] / lookups if lookups else 0.0
+        return totals
+
+
+class ConcurrentFIFOCache(ShardedCache):
+    """Lock-striped `FIFOCache`."""
+    POLICY = FIFOCache
+
+
+class ConcurrentLIFOCache(ShardedCache):
+    """Lock-striped `LIFOCache`."""
+    POLICY = LIFOCache
+
+
+class ConcurrentLRUCache(ShardedCache):
+    """Lock-striped `LRUCache`."""
+    POLICY = LRUCache
+
+
+class ConcurrentMRUCache(ShardedCache):
+    """Lock-striped `MRUCache`."""
+    POLICY = MRUCache
+
+
+class ConcurrentLFUCache(ShardedCache):
+    """Lock-striped `LFUCache`."""
+    POLICY = LFUCache
+
+
+class ConcurrentARCCache(ShardedCache):
+    """Lock-striped `ARCCache`."""
+    POLICY = ARCCache
+
+
+class ConcurrentWTinyLFUCache(ShardedCache):
+    """Lock-striped `WTinyLFUCache`."""
+    POLICY = WTinyLFUCache
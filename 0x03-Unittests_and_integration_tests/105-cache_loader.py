@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Task 10: Loading caches with single-flight request coalescing.
+"""
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class AsyncLoadingCache():
+    """Wraps a cache so that concurrent misses on the same key, from
+    coroutines of one event loop, await a single call to `loader`.
+
+    The load runs in its own task: cancelling one waiter does not
+    cancel it for the others, while an exception raised (or a
+    cancellation happening) inside the load reaches every waiter. A
+    failed load is not cached and the next miss tries again.
+    """
+
+    def __init__(self, cache, loader: Callable[[Hashable], Awaitable] = None
+                 ) -> None:
+        """Initializes the loading cache.
+        """
+        self.cache = cache
+        self.loader = loader
+        self.in_flight: Dict[Hashable, asyncio.Task] = {}
+
+    async def get_or_load(self, key: Hashable,
+                          loader: Callable[[Hashable], Awaitable] = None,
+                          ttl: float = None) -> Any:
+        """Returns the item of `key`, loading and caching it on a miss.
+        """
+        item = self.cache.get(key)
+        if item is not None:
+            return item
+        task = self.in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(
+                self._load(key, loader or self.loader, ttl))
+            self.in_flight[key] = task
+            task.add_done_callback(lambda done: self._landed(key, done))
+        return await asyncio.shield(task)
+
+    async def _load(self, key: Hashable,
+                    loader: Callable[[Hashable], Awaitable],
+                    ttl: float) -> Any:
+        """Runs `loader` and caches what it returns.
+        """
+        item = await loader(key)
+        if item is not None:
+            self.cache.put(key, item, ttl)
+        return item
+
+    def _landed(self, key: Hashable, task: asyncio.Task) -> None:
+        """Forgets a finished load.
+
+        Its exception is marked as retrieved, since every waiter may
+        have been cancelled in the meantime.
+        """
+        if self.in_flight.get(key) is task:
+            del self.in_flight[key]
+        if not task.cancelled():
+            task.exception()
+
+
+class LoadingCache():
+    """Wraps a cache so that concurrent misses on the same key, from
+    several threads, wait for a single call to `loader`.
+
+    The wrapped cache is accessed from every calling thread, so it
+    must be thread-safe itself (e.g. a lock-striped cache).
+    """
+
+    def __init__(self, cache, loader: Callable[[Hashable], Any] = None
+                 ) -> None:
+        """Initializes the loading cache.
+        """
+        self.cache = cache
+        self.loader = loader
+        self.in_flight: Dict[Hashable, Future] = {}
+        self.lock = threading.Lock()
+
+    def get_or_load(self, key: Hashable,
+                    loader: Callable[[Hashable], Any] = None,
+                    ttl: float = None) -> Any:
+        """Returns the item of `key`, loading and caching it on a miss.
+
+        The first thread to miss runs the load; the others block on
+        its outcome and get the same item or exception.
+        """
+        item = self.cache.get(key)
+        if item is not None:
+            return item
+        with self.lock:
+            future = self.in_flight.get(key)
+            leader = future is None
+            if leader:
+                # A load may have landed between the miss and the lock.
+                item = self.cache.get(key)
+                if item is not None:
+                    return item
+                future = self.in_flight[key] = Future()
+        if not leader:
+            return future.result()
+        try:
+            item = (loader or self.loader)(key)
+            if item is not None:
+                self.cache.put(key, item, ttl)
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        else:
+            future.set_result(item)
+            return item
+        finally:
+            with self.lock:
+                del self.in_flight[key]
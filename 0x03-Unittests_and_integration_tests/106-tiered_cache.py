@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""Task 11: Two-tier caching module backed by SQLite.
+"""
+import pickle
+import sqlite3
+import time
+
+
+class DiskTier():
+    """A least recently stored cache of pickled entries kept in a
+    SQLite file, bounded to `capacity` entries.
+
+    Keys must be picklable and are matched on their pickled form. An
+    entry stored with a TTL keeps its deadline, as read from `clock`,
+    and is a miss once it has passed.
+    """
+
+    def __init__(self, path, capacity=10000, clock=time.time):
+        """Opens (or creates) the SQLite file at `path`.
+        """
+        self.path = path
+        self.capacity = capacity
+        self.clock = clock
+        self.connection = sqlite3.connect(path, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("PRAGMA mmap_size=268435456")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key BLOB PRIMARY KEY, item BLOB NOT NULL, "
+            "used INTEGER NOT NULL, deadline REAL)")
+        columns = [row[1] for row in self.connection.execute(
+            "PRAGMA table_info(entries)")]
+        if "deadline" not in columns:
+            self.connection.execute(
+                "ALTER TABLE entries ADD COLUMN deadline REAL")
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS entries_used ON entries (used)")
+        self.size, self.tick = self.connection.execute(
+            "SELECT COUNT(*), COALESCE(MAX(used), 0) FROM entries"
+        ).fetchone()
+
+    def __len__(self):
+        """Number of entries on disk.
+        """
+        return self.size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def put(self, key, item, ttl=None):
+        """Stores an entry, optionally expiring after `ttl`, dropping
+        the expired entries then the oldest ones past capacity.
+        """
+        self.tick += 1
+        now = self.clock()
+        row = (pickle.dumps(item, pickle.HIGHEST_PROTOCOL), self.tick,
+               None if ttl is None else now + ttl,
+               pickle.dumps(key, pickle.HIGHEST_PROTOCOL))
+        cursor = self.connection.execute(
+            "UPDATE entries SET item = ?, used = ?, deadline = ? "
+            "WHERE key = ?", row)
+        if cursor.rowcount:
+            return
+        self.connection.execute(
+            "INSERT INTO entries (item, used, deadline, key) "
+            "VALUES (?, ?, ?, ?)", row)
+        self.size += 1
+        if self.size > self.capacity:
+            self.size -= self.connection.execute(
+                "DELETE FROM entries WHERE deadline <= ?", (now,)).rowcount
+        if self.size > self.capacity:
+            self.connection.execute(
+                "DELETE FROM entries WHERE key IN "
+                "(SELECT key FROM entries ORDER BY used LIMIT ?)",
+                (self.size - self.capacity,))
+            self.size = self.capacity
+
+    def pop(self, key):
+        """Removes an entry and returns its item along with the time
+        it had left (None when it does not expire), or None when it is
+        missing or expired.
+        """
+        blob = pickle.dumps(key, pickle.HIGHEST_PROTOCOL)
+        row = self.connection.execute(
+            "SELECT item, deadline FROM entries WHERE key = ?",
+            (blob,)).fetchone()
+        if row is None:
+            return None
+        self.connection.execute("DELETE FROM entries WHERE key = ?", (blob,))
+        self.size -= 1
+        item, deadline = row
+        if deadline is None:
+            return pickle.loads(item), None
+        ttl = deadline - self.clock()
+        if ttl <= 0:
+            return None
+        return pickle.loads(item), ttl
+
+    def delete(self, key):
+        """Removes an entry, telling whether it was there.
+        """
+        cursor = self.connection.execute(
+            "DELETE FROM entries WHERE key = ?",
+            (pickle.dumps(key, pickle.HIGHEST_PROTOCOL),))
+        self.size -= cursor.rowcount
+        return cursor.rowcount > 0
+
+    def close(self):
+        """Closes the SQLite connection.
+        """
+        self.connection.close()
+
+
+class TieredCache():
+    """An in-memory cache in front of a `DiskTier`.
+
+    Entries evicted from `memory` are demoted to `disk`, and a miss in
+    memory that hits the disk promotes the entry back, so every key
+    lives in at most one tier. Expired, deleted or rejected entries
+    are not demoted. A demoted entry keeps the time it had left before
+    expiring, on disk and once promoted back; one that never expired
+    gets the memory cache's default TTL when promoted.
+    """
+
+    def __init__(self, memory, disk):
+        """Initializes the tiers.
+        """
+        self.memory = memory
+        self.disk = disk
+        self.disk_hits = 0
+        self.disk_misses = 0
+        self.demotions = 0
+        memory.add_listener(self._demote)
+
+    def _demote(self, key, item, cause):
+        """Moves an entry evicted from memory to disk, along with the
+        time it has left.
+        """
+        if cause != "evicted":
+            return
+        ttl = None
+        deadline = self.memory.deadlines.get(key)
+        if deadline is not None:
+            ttl = deadline - self.memory.clock()
+            if ttl <= 0:
+                return
+        self.disk.put(key, item, ttl)
+        self.demotions += 1
+
+    def put(self, key, item, ttl=None):
+        """Adds an item in the memory tier.
+        """
+        if key is None or item is None:
+            return
+        if len(self.disk):
+            self.disk.delete(key)
+        self.memory.put(key, item, ttl)
+
+    def get(self, key):
+        """Retrieves an item from memory, then from disk.
+        """
+        item = self.memory.get(key)
+        if item is not None or key is None:
+            return item
+        entry = self.disk.pop(key) if len(self.disk) else None
+        if entry is None:
+            self.disk_misses += 1
+            return None
+        item, ttl = entry
+        self.disk_hits += 1
+        self.memory.put(key, item, ttl)
+        return item
+
+    def delete(self, key):
+        """Removes `key` from both tiers, telling whether it was there.
+        """
+        in_memory = self.memory.delete(key)
+        on_disk = bool(len(self.disk)) and self.disk.delete(key)
+        return in_memory or on_disk
+
+    def stats(self):
+        """Returns the memory tier counters along with the disk ones.
+        """
+        stats = self.memory.stats()
+        stats.update({
+            "disk_hits": self.disk_hits,
+            "disk_misses": self.disk_misses,
+            "demotions": self.demotions,
+            "disk_size": len(self.disk),
+        })
+        return stats
+
+    def close(self):
+        """Detaches from the memory tier and closes the disk tier.
+        """
+        self.memory.remove_listener(self._demote)
+        self.disk.close()
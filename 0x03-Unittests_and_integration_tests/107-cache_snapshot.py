@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Task 12: Warm-start snapshots of the caching policies.
+
+A snapshot file is a short header followed by the pickled
+`BaseCaching.snapshot()` of a cache, which keeps the entries along
+with their recency, frequency and expiry metadata:
+
+    save(cache, "cache.snap")         # e.g. on shutdown
+    load(fresh_cache, "cache.snap")   # on startup
+"""
+import contextlib
+import os
+import pickle
+import threading
+
+MAGIC = b"BCSNAP"
+VERSION = 1
+
+
+def encode(state):
+    """Returns the binary form of a `snapshot()` state.
+    """
+    return (MAGIC + bytes([VERSION]) +
+            pickle.dumps(state, pickle.HIGHEST_PROTOCOL))
+
+
+def dumps(cache):
+    """Returns the binary snapshot of `cache`.
+    """
+    return encode(cache.snapshot())
+
+
+def loads(cache, data):
+    """Restores `cache` from a binary snapshot.
+    """
+    header = MAGIC + bytes([VERSION])
+    if not data.startswith(header):
+        raise ValueError("not a version {} cache snapshot".format(VERSION))
+    cache.restore(pickle.loads(data[len(header):]))
+
+
+def save(cache, path):
+    """Writes the snapshot of `cache` to `path` atomically.
+    """
+    write(dumps(cache), path)
+
+
+def write(data, path):
+    """Writes `data` next to `path`, then renames it over `path`.
+    """
+    temp_path = "{}.{}.tmp".format(path, os.getpid())
+    with open(temp_path, "wb") as snapshot:
+        snapshot.write(data)
+        snapshot.flush()
+        os.fsync(snapshot.fileno())
+    os.replace(temp_path, path)
+
+
+def load(cache, path):
+    """Restores `cache` from the snapshot at `path`, telling whether
+    there was one.
+    """
+    try:
+        with open(path, "rb") as snapshot:
+            data = snapshot.read()
+    except FileNotFoundError:
+        return False
+    loads(cache, data)
+    return True
+
+
+class Checkpointer(threading.Thread):
+    """A daemon thread saving a snapshot of `cache` to `path` every
+    `interval` seconds.
+
+    Pass the `lock` guarding the cache when other threads use it: it
+    is held while the snapshot is taken, not while it is written.
+    """
+
+    def __init__(self, cache, path, interval=60.0, lock=None):
+        """Initializes the checkpointer; call start() to run it.
+        """
+        super().__init__(name="cache-checkpointer", daemon=True)
+        self.cache = cache
+        self.path = path
+        self.interval = interval
+        self.lock = lock or contextlib.nullcontext()
+        self.stopped = threading.Event()
+
+    def run(self):
+        """Saves a snapshot every `interval` seconds until stopped.
+        """
+        while not self.stopped.wait(self.interval):
+            self.checkpoint()
+
+    def checkpoint(self):
+        """Saves a snapshot now.
+        """
+        with self.lock:
+            state = self.cache.snapshot()
+        write(encode(state), self.path)
+
+    def stop(self, final=True):
+        """Stops the thread, saving a last snapshot if `final`.
+        """
+        self.stopped.set()
+        if self.is_alive():
+            self.join()
+        if final:
+            self.checkpoint()
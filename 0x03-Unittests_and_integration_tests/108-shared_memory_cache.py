@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""Task 13: Cross-process shared-memory caching module.
+"""
+import fcntl
+import hashlib
+import os
+import pickle
+import struct
+import tempfile
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+HEADER = struct.Struct("<8sIIII")
+SLOT = struct.Struct("<BBHIQd")
+MAGIC = b"SHMCACHE"
+VERSION = 1
+# Held while a block is created or attached to: POSIX record locks do
+# not exclude the threads of one process from each other.
+_CREATION_LOCK = threading.Lock()
+
+
+class SharedMemoryCache():
+    """A cache living in a named `multiprocessing.shared_memory` block
+    that every process of the host can attach to.
+
+    The block is a table of `sets` x `ways` fixed-size slots. A key
+    is hashed (with a hash that is stable across processes) to one
+    set, and a full set evicts with the CLOCK algorithm: a slot read
+    since the hand last passed gets a second chance. Keys and items
+    are pickled and must fit in a slot together.
+
+    Each set is guarded by a byte-range lock on a lock file next to
+    the block, so processes only contend when they touch the same
+    set. The first byte of the lock file guards the creation of the
+    block, so no process attaches to it before its header is written.
+    """
+
+    def __init__(self, name, sets=128, ways=8, slot_size=4096):
+        """Creates the block `name`, or attaches to it if it exists
+        (its geometry then wins over the arguments).
+
+        `ways` is at most 255, as the CLOCK hand of a set is one byte.
+        """
+        if not 1 <= ways <= 0xFF:
+            raise ValueError("ways must be between 1 and 255")
+        self.lock_path = os.path.join(tempfile.gettempdir(),
+                                      "{}.lock".format(name))
+        self.lock_fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            with _CREATION_LOCK:
+                fcntl.lockf(self.lock_fd, fcntl.LOCK_EX, 1, 0)
+                try:
+                    sets, ways, slot_size = self._open(name, sets, ways,
+                                                       slot_size)
+                finally:
+                    fcntl.lockf(self.lock_fd, fcntl.LOCK_UN, 1, 0)
+        except BaseException:
+            os.close(self.lock_fd)
+            raise
+        self.name = name
+        self.sets = sets
+        self.ways = ways
+        self.slot_size = slot_size
+        self.capacity = sets * ways
+        self.hands = HEADER.size
+        self.slots = self.hands + sets
+        self.thread_locks = [threading.Lock() for _ in range(sets)]
+        self.hits = 0
+        self.misses = 0
+        self.puts = 0
+        self.evictions = 0
+
+    def _open(self, name, sets, ways, slot_size):
+        """Creates or attaches to the block, returning its geometry.
+        """
+        self.created = True
+        try:
+            self.shm = shared_memory.SharedMemory(
+                name, create=True,
+                size=self._size(sets, ways, slot_size))
+            HEADER.pack_into(self.shm.buf, 0, MAGIC, VERSION,
+                             sets, ways, slot_size)
+            return sets, ways, slot_size
+        except FileExistsError:
+            self.created = False
+        self.shm = shared_memory.SharedMemory(name)
+        # Only the creator may destroy the block when it exits.
+        resource_tracker.unregister(self.shm._name, "shared_memory")
+        magic, version, sets, ways, slot_size = HEADER.unpack_from(
+            self.shm.buf, 0)
+        if magic != MAGIC or version != VERSION:
+            self.shm.close()
+            raise ValueError("{} is not a version {} cache".format(
+                name, VERSION))
+        return sets, ways, slot_size
+
+    @staticmethod
+    def _size(sets, ways, slot_size):
+        """Bytes needed by a table of this geometry.
+        """
+        return HEADER.size + sets + sets * ways * slot_size
+
+    @staticmethod
+    def _hash(blob):
+        """Hash of a pickled key, identical in every process.
+        """
+        return int.from_bytes(
+            hashlib.blake2b(blob, digest_size=8).digest(), "little")
+
+    def _locked(self, index):
+        """Context manager holding the lock of set `index`.
+        """
+        return _SetLock(self, index)
+
+    def _find(self, index, digest, blob):
+        """Returns the offset of the slot holding the key, or None.
+        """
+        buf = self.shm.buf
+        first = self.slots + index * self.ways * self.slot_size
+        for way in range(self.ways):
+            offset = first + way * self.slot_size
+            used, _, key_len, _, slot_hash, _ = SLOT.unpack_from(buf, offset)
+            start = offset + SLOT.size
+            if used and slot_hash == digest and key_len == len(blob) and \
+                    buf[start:start + key_len] == blob:
+                return offset
+        return None
+
+    def _clock(self, index):
+        """Returns the offset of a free slot of set `index`, evicting
+        the CLOCK victim if the set is full.
+        """
+        buf = self.shm.buf
+        first = self.slots + index * self.ways * self.slot_size
+        for way in range(self.ways):
+            if not buf[first + way * self.slot_size]:
+                return first + way * self.slot_size
+        hand = buf[self.hands + index] % self.ways
+        while buf[first + hand * self.slot_size + 1]:
+            buf[first + hand * self.slot_size + 1] = 0
+            hand = (hand + 1) % self.ways
+        buf[self.hands + index] = (hand + 1) % self.ways
+        self.evictions += 1
+        return first + hand * self.slot_size
+
+    def put(self, key, item, ttl=None):
+        """Adds an item in the cache. An item too large for a slot is
+        not cached, and the previous item of `key` is removed.
+        """
+        if key is None or item is None:
+            return
+        blob = pickle.dumps(key, pickle.HIGHEST_PROTOCOL)
+        value = pickle.dumps(item, pickle.HIGHEST_PROTOCOL)
+        if SLOT.size + len(blob) + len(value) > self.slot_size or \
+                len(blob) > 0xFFFF:
+            self.delete(key)
+            return
+        digest = self._hash(blob)
+        index = digest % self.sets
+        expires = 0.0 if ttl is None else time.time() + ttl
+        with self._locked(index):
+            offset = self._find(index, digest, blob)
+            if offset is None:
+                offset = self._clock(index)
+            buf = self.shm.buf
+            start = offset + SLOT.size
+            buf[start:start + len(blob)] = blob
+            buf[start + len(blob):start + len(blob) + len(value)] = value
+            SLOT.pack_into(buf, offset, 1, 0, len(blob), len(value),
+                           digest, expires)
+        self.puts += 1
+
+    def get(self, key):
+        """Retrieves an item by key.
+        """
+        if key is None:
+            self.misses += 1
+            return None
+        blob = pickle.dumps(key, pickle.HIGHEST_PROTOCOL)
+        digest = self._hash(blob)
+        index = digest % self.sets
+        value = None
+        with self._locked(index):
+            offset = self._find(index, digest, blob)
+            if offset is not None:
+                buf = self.shm.buf
+                _, _, key_len, value_len, _, expires = SLOT.unpack_from(
+                    buf, offset)
+                if expires and expires <= time.time():
+                    buf[offset] = 0
+                else:
+                    buf[offset + 1] = 1
+                    start = offset + SLOT.size + key_len
+                    value = bytes(buf[start:start + value_len])
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return pickle.loads(value)
+
+    def delete(self, key):
+        """Removes `key`, telling whether it was cached.
+        """
+        blob = pickle.dumps(key, pickle.HIGHEST_PROTOCOL)
+        digest = self._hash(blob)
+        index = digest % self.sets
+        with self._locked(index):
+            offset = self._find(index, digest, blob)
+            if offset is None:
+                return False
+            self.shm.buf[offset] = 0
+            return True
+
+    def stats(self):
+        """Returns this process' counters and the table's fill level.
+        """
+        buf = self.shm.buf
+        size = sum(buf[self.slots + slot * self.slot_size]
+                   for slot in range(self.capacity))
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "puts": self.puts,
+            "evictions": self.evictions,
+            "size": size,
+        }
+
+    def close(self):
+        """Detaches this process from the block.
+        """
+        os.close(self.lock_fd)
+        self.shm.close()
+
+    def unlink(self):
+        """Destroys the block; call once, from the process that
+        created it, after every process closed it.
+        """
+        # An attached child may share our resource tracker and have
+        # unregistered the block already; unlink() expects it there.
+        resource_tracker.register(self.shm._name, "shared_memory")
+        self.shm.unlink()
+        try:
+            os.remove(self.lock_path)
+        except FileNotFoundError:
+            pass
+
+
+class _SetLock():
+    """Holds the lock of one set, for threads and processes alike.
+    """
+
+    def __init__(self, cache, index):
+        self.cache = cache
+        self.index = index
+
+    def __enter__(self):
+        self.cache.thread_locks[self.index].acquire()
+        fcntl.lockf(self.cache.lock_fd, fcntl.LOCK_EX, 1, self.index + 1)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        fcntl.lockf(self.cache.lock_fd, fcntl.LOCK_UN, 1, self.index + 1)
+        self.cache.thread_locks[self.index].release()
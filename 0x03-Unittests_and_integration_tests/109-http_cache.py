@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Task 14: Persistent HTTP response cache with revalidation.
+"""
+import sqlite3
+import threading
+import time
+
+
+class HTTPCache():
+    """Response bodies of GET requests kept in a SQLite file, keyed by
+    URL, along with their `ETag` and `Last-Modified` validators and
+    their `Link` header (for pagination).
+
+    A response younger than `ttl` seconds is served without a request.
+    An older one is revalidated with `If-None-Match` and
+    `If-Modified-Since`: on a 304 the stored body is reused and stays
+    fresh for another `ttl`. Only successful responses are stored.
+    """
+
+    def __init__(self, path, ttl=60.0, clock=time.time):
+        """Opens (or creates) the SQLite file at `path`.
+        """
+        self.path = path
+        self.ttl = ttl
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, isolation_level=None,
+                                          check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "url TEXT PRIMARY KEY, body BLOB NOT NULL, etag TEXT, "
+            "last_modified TEXT, link TEXT, fetched REAL NOT NULL)")
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _lookup(self, url):
+        """Returns the stored (body, link, etag, last_modified, fetched).
+        """
+        with self.lock:
+            return self.connection.execute(
+                "SELECT body, link, etag, last_modified, fetched "
+                "FROM responses WHERE url = ?", (url,)).fetchone()
+
+    def fetch(self, session, url, **kwargs):
+        """GETs `url` through `session` (extra arguments are passed to
+        `session.get`), returning the body of the response and its
+        `Link` header.
+        """
+        row = self._lookup(url)
+        headers = dict(kwargs.pop("headers", None) or {})
+        if row is not None:
+            body, link, etag, last_modified, fetched = row
+            if self.clock() - fetched < self.ttl:
+                self.hits += 1
+                return body, link
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        response = session.get(url, headers=headers, **kwargs)
+        now = self.clock()
+        if response.status_code == 304 and row is not None:
+            self.revalidations += 1
+            with self.lock:
+                self.connection.execute(
+                    "UPDATE responses SET fetched = ?, "
+                    "etag = COALESCE(?, etag) WHERE url = ?",
+                    (now, response.headers.get("ETag"), url))
+            return row[0], row[1]
+        self.misses += 1
+        body = response.content
+        link = response.headers.get("Link")
+        if 200 <= response.status_code < 300:
+            with self.lock:
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO responses "
+                    "(url, body, etag, last_modified, link, fetched) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (url, body, response.headers.get("ETag"),
+                     response.headers.get("Last-Modified"), link, now))
+        return body, link
+
+    def delete(self, url):
+        """Forgets the response of `url`, telling whether there was one.
+        """
+        with self.lock:
+            cursor = self.connection.execute(
+                "DELETE FROM responses WHERE url = ?", (url,))
+        return cursor.rowcount > 0
+
+    def stats(self):
+        """Returns the fresh hits, 304 revalidations and full fetches.
+        """
+        return {
+            "hits": self.hits,
+            "revalidations": self.revalidations,
+            "misses": self.misses,
+        }
+
+    def close(self):
+        """Closes the SQLite connection.
+        """
+        with self.lock:
+            self.connection.close()
@@ -11,25 +11,34 @@ class LIFOCache(BaseCaching):
     retrieving items from a dictionary with a LIFO
     removal mechanism when the limit is reached.
     """
-    def __init__(self):
+    def __init__(self, *args, **kwargs):
         """Initializes the cache.
         """
-        super().__init__()
+        super().__init__(*args, **kwargs)
         self.cache_data = OrderedDict()
 
-    def put(self, key, item):
+    def put(self, key, item, ttl=None):
         """Adds an item in the cache.
         """
         if key is None or item is None:
             return
-        if key not in self.cache_data:
-            if len(self.cache_data) + 1 > BaseCaching.MAX_ITEMS:
-                last_key, _ = self.cache_data.popitem(True)
-                print("DISCARD:", last_key)
-        self.cache_data[key] = item
+        weight = self._weigh(key, item)
+        if not self._make_room(key, weight):
+            return
+        self._store(key, item, weight, ttl)
         self.cache_data.move_to_end(key, last=True)
 
     def get(self, key):
         """Retrieves an item by key.
         """
-        return self.cache_data.get(key, None)
+        item = self.cache_data.get(key)
+        if item is None or not self._alive(key):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return item
+
+    def _victim(self, key):
+        """Returns the last key put in the cache.
+        """
+        return self._other_than(key, reversed(self.cache_data))
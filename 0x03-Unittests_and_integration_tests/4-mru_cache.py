@@ -10,29 +10,43 @@ class MRUCache(BaseCaching):
     """A class `MRUCache` that inherits
        from `BaseCaching` and is a caching system
     """
-    def __init__(self):
+    def __init__(self, *args, **kwargs):
         """Initializes the cache.
         """
-        super().__init__()
+        super().__init__(*args, **kwargs)
         self.cache_data = OrderedDict()
 
-    def put(self, key, item):
+    def put(self, key, item, ttl=None):
         """Adds an item in the cache.
         """
         if key is None or item is None:
             return
+        weight = self._weigh(key, item)
+        if not self._make_room(key, weight):
+            return
         if key not in self.cache_data:
-            if len(self.cache_data) + 1 > BaseCaching.MAX_ITEMS:
-                mru_key, _ = self.cache_data.popitem(False)
-                print("DISCARD:", mru_key)
-            self.cache_data[key] = item
+            self._store(key, item, weight, ttl)
             self.cache_data.move_to_end(key, last=False)
         else:
-            self.cache_data[key] = item
+            self._store(key, item, weight, ttl)
 
     def get(self, key):
         """Retrieves an item by key.
         """
-        if key is not None and key in self.cache_data:
-            self.cache_data.move_to_end(key, last=False)
-        return self.cache_data.get(key, None)
+        item = self.cache_data.get(key)
+        if item is None or not self._alive(key):
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._hit(key)
+        return item
+
+    def _hit(self, key):
+        """Moves `key` to the most recently used end.
+        """
+        self.cache_data.move_to_end(key, last=False)
+
+    def _victim(self, key):
+        """Returns the most recently used key.
+        """
+        return self._other_than(key, self.cache_data)
@@ -0,0 +1,411 @@
+#!/usr/bin/python3
+""" BaseCaching module
+"""
+import heapq
+import inspect
+import itertools
+import time
+
+
+def print_discard(key, item, cause=None):
+    """ Eviction listener printing the discarded key
+    """
+    print("DISCARD: {}".format(key))
+
+
+def _with_cause(listener):
+    """ Adapt a `listener(key, item)` to the `(key, item, cause)` call
+    """
+    try:
+        inspect.signature(listener).bind(None, None, None)
+    except TypeError:
+        return lambda key, item, cause: listener(key, item)
+    except ValueError:
+        pass
+    return listener
+
+
+class BaseCaching():
+    """ BaseCaching defines:
+      - constants of your caching system
+      - where your data are stored (in a dictionary)
+      - the per-instance entry and weight budgets
+      - the eviction listeners and usage counters
+      - the expiry deadlines of the entries
+    """
+    MAX_ITEMS = 4
+
+    def __init__(self, capacity=None, weigher=None, max_weight=None,
+                 on_evict=None, expire_after_write=None,
+                 expire_after_access=None, clock=time.monotonic):
+        """ Initiliaze
+
+        `capacity` bounds the number of entries (defaults to MAX_ITEMS).
+        `weigher(key, item)` returns the weight of an entry (1 if not
+        given) and `max_weight`, when set, bounds the total weight.
+        `on_evict(key, item, cause)` is called for every entry
+        discarded because it was "evicted" or "expired"; a listener
+        taking only `(key, item)` is called without the cause.
+        Entries expire `expire_after_write` seconds after being put
+        and/or `expire_after_access` seconds after their last read,
+        as measured by `clock()`.
+        """
+        self.cache_data = {}
+        self.capacity = self.MAX_ITEMS if capacity is None else capacity
+        self.weigher = weigher
+        self.max_weight = max_weight
+        self.weights = {}
+        self.total_weight = 0
+        self.listeners = []
+        self._callbacks = []
+        if on_evict is not None:
+            self.add_listener(on_evict)
+        self.hits = 0
+        self.misses = 0
+        self.puts = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.expire_after_write = expire_after_write
+        self.expire_after_access = expire_after_access
+        self.clock = clock
+        self._batch_now = None
+        self.deadlines = {}
+        self.written = {}
+        self.scheduled = {}
+        self.expiry_heap = []
+        self._seq = itertools.count()
+
+    def print_cache(self):
+        """ Print the cache
+        """
+        print("Current cache:")
+        for key in sorted(self.cache_data.keys()):
+            print("{}: {}".format(key, self.cache_data.get(key)))
+
+    def put(self, key, item, ttl=None):
+        """ Add an item in the cache, optionally expiring after `ttl`
+        """
+        raise NotImplementedError("put must be implemented in your cache class")
+
+    def get(self, key):
+        """ Get an item by key
+        """
+        raise NotImplementedError("get must be implemented in your cache class")
+
+    def delete(self, key):
+        """ Remove `key` from the cache, telling whether it was there
+        """
+        if key not in self.cache_data:
+            return False
+        self._discard(key, "deleted")
+        return True
+
+    def get_many(self, keys):
+        """ Get the items of `keys`, in the same order
+
+        Equivalent to calling get() on each key, with the attribute
+        lookups and the clock read done once for the whole batch.
+        """
+        data = self.cache_data
+        alive = self._alive
+        hit = self._hit
+        now = self.clock() if self.deadlines else None
+        items = []
+        hits = 0
+        for key in keys:
+            item = data.get(key)
+            if item is None or not alive(key, now):
+                item = None
+            else:
+                hits += 1
+                hit(key)
+            items.append(item)
+        self.hits += hits
+        self.misses += len(items) - hits
+        return items
+
+    def put_many(self, items, ttl=None):
+        """ Add every (key, item) pair of `items` (or of a mapping),
+        in order, as put() would
+
+        The clock is read once for the whole batch: expiry purges and
+        deadlines all use that reading, so the evictions and counters
+        are those of put() calls made at that instant.
+        """
+        if hasattr(items, "items"):
+            items = items.items()
+        put = self.put
+        self._batch_now = self.clock()
+        try:
+            for key, item in items:
+                put(key, item, ttl)
+        finally:
+            self._batch_now = None
+
+    def delete_many(self, keys):
+        """ Remove `keys` from the cache, returning how many were there
+        """
+        data = self.cache_data
+        discard = self._discard
+        deleted = 0
+        for key in keys:
+            if key in data:
+                discard(key, "deleted")
+                deleted += 1
+        return deleted
+
+    def snapshot(self):
+        """ Picklable state of the entries and of the policy metadata
+
+        Entries are listed in the cache's order with their weight and
+        the time left before their deadlines, as clock readings do not
+        survive a restart.
+        """
+        now = self.clock() if self.deadlines else None
+        entries = []
+        for key, item in self.cache_data.items():
+            deadline = self.deadlines.get(key)
+            left = written = None
+            if deadline is not None:
+                left = deadline - now
+                if key in self.written:
+                    written = self.written[key] - now
+            entries.append((key, item, self.weights[key], left, written))
+        return {
+            "policy": type(self).__name__,
+            "entries": entries,
+            "meta": self._policy_state(),
+        }
+
+    def restore(self, state):
+        """ Replace the content of the cache with a snapshot()
+
+        The entries are bulk-loaded without going through put(), then
+        trimmed to this cache's budgets if it is smaller and has an
+        eviction policy.
+        """
+        if state["policy"] != type(self).__name__:
+            raise ValueError("snapshot of a {}, not a {}".format(
+                state["policy"], type(self).__name__))
+        for key in list(self.cache_data):
+            self._discard(key, "deleted")
+        now = self.clock()
+        for key, item, weight, left, written in state["entries"]:
+            self.cache_data[key] = item
+            self.weights[key] = weight
+            self.total_weight += weight
+            if left is not None:
+                self.deadlines[key] = now + left
+                if written is not None:
+                    self.written[key] = now + written
+        self.scheduled = dict(self.deadlines)
+        self._compact_expiry_heap()
+        self._load_policy_state(state["meta"])
+        if type(self)._victim is BaseCaching._victim:
+            return
+        while self.cache_data and (
+                len(self.cache_data) > self.capacity or
+                (self.max_weight is not None and
+                 self.total_weight > self.max_weight)):
+            self._discard(self._victim(None))
+
+    def add_listener(self, listener):
+        """ Call `listener(key, item, cause)` whenever an entry is
+        evicted or expires, or `listener(key, item)` if it takes two
+        arguments
+        """
+        self.listeners.append(listener)
+        self._callbacks.append(_with_cause(listener))
+
+    def remove_listener(self, listener):
+        """ Stop calling `listener` on discards
+        """
+        index = self.listeners.index(listener)
+        del self.listeners[index]
+        del self._callbacks[index]
+
+    def stats(self):
+        """ Snapshot of the usage counters
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "puts": self.puts,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "size": len(self.cache_data),
+            "weight": self.total_weight,
+        }
+
+    def purge_expired(self):
+        """ Discard the entries whose deadline has passed
+
+        Only expired heap heads are popped; an entry whose deadline was
+        pushed back by a read is re-queued at its new deadline.
+        """
+        heap = self.expiry_heap
+        if not heap:
+            return
+        now = self._now()
+        while heap and heap[0][0] <= now:
+            deadline, _, key = heapq.heappop(heap)
+            if self.scheduled.get(key) != deadline:
+                continue
+            current = self.deadlines[key]
+            if current <= now:
+                self._discard(key, "expired")
+            else:
+                self.scheduled[key] = current
+                heapq.heappush(heap, (current, next(self._seq), key))
+
+    def _now(self):
+        """ Current time: the batch's clock reading inside put_many()
+        """
+        if self._batch_now is not None:
+            return self._batch_now
+        return self.clock()
+
+    def _alive(self, key, now=None):
+        """ Tell whether a cached `key` has not expired yet at `now`
+
+        An expired entry is discarded on the spot, a live one has its
+        access deadline pushed back.
+        """
+        deadline = self.deadlines.get(key)
+        if deadline is None:
+            return True
+        if now is None:
+            now = self._now()
+        if deadline <= now:
+            self._discard(key, "expired")
+            return False
+        if self.expire_after_access is not None:
+            self.deadlines[key] = min(self.written[key],
+                                      now + self.expire_after_access)
+        return True
+
+    def _schedule(self, key, ttl):
+        """ Set the expiry deadline of a freshly written entry
+        """
+        if ttl is None:
+            ttl = self.expire_after_write
+        if ttl is None and self.expire_after_access is None:
+            if key in self.deadlines:
+                del self.deadlines[key]
+                self.scheduled.pop(key, None)
+            return
+        now = self._now()
+        deadline = float("inf") if ttl is None else now + ttl
+        if self.expire_after_access is not None:
+            self.written[key] = deadline
+            deadline = min(deadline, now + self.expire_after_access)
+        self.deadlines[key] = deadline
+        if deadline < self.scheduled.get(key, float("inf")):
+            self.scheduled[key] = deadline
+            heapq.heappush(self.expiry_heap,
+                           (deadline, next(self._seq), key))
+            if len(self.expiry_heap) > 2 * len(self.scheduled) + 64:
+                self._compact_expiry_heap()
+
+    def _compact_expiry_heap(self):
+        """ Rebuild the expiry heap from the scheduled deadlines
+
+        Discarded or rescheduled entries leave dead heap items behind;
+        rebuilding once they outnumber the live ones keeps the heap
+        O(size) at an amortized O(1) cost per write.
+        """
+        self.expiry_heap = [(deadline, next(self._seq), key)
+                            for key, deadline in self.scheduled.items()]
+        heapq.heapify(self.expiry_heap)
+
+    def _hit(self, key):
+        """ Record a read of a live `key` in the eviction order
+        """
+
+    def _policy_state(self):
+        """ Picklable eviction metadata beyond the entries' order
+        """
+        return None
+
+    def _load_policy_state(self, state):
+        """ Rebuild the eviction metadata from _policy_state()
+        """
+
+    def _weigh(self, key, item):
+        """ Weight of an entry
+        """
+        if self.weigher is None:
+            return 1
+        return self.weigher(key, item)
+
+    def _overflows(self, key, weight):
+        """ Tell whether storing `weight` under `key` breaks a budget
+        """
+        if key not in self.cache_data and \
+                len(self.cache_data) + 1 > self.capacity:
+            return True
+        if self.max_weight is None:
+            return False
+        return (self.total_weight - self.weights.get(key, 0) + weight >
+                self.max_weight)
+
+    def _make_room(self, key, weight):
+        """ Discard victims until `weight` fits under `key`
+
+        Returns False when the entry cannot fit at all, in which case
+        any stale value under `key` is discarded too, as "rejected".
+        """
+        if self.expiry_heap:
+            self.purge_expired()
+        too_heavy = self.max_weight is not None and weight > self.max_weight
+        while self._overflows(key, weight):
+            victim = None if too_heavy else self._victim(key)
+            if victim is None:
+                if key in self.cache_data:
+                    self._discard(key, "rejected")
+                return False
+            self._discard(victim)
+        return True
+
+    def _victim(self, key):
+        """ Next key to discard, other than `key`
+        """
+        raise NotImplementedError("_victim must be implemented in your "
+                                  "cache class")
+
+    @staticmethod
+    def _other_than(key, keys):
+        """ First of `keys` that is not `key`
+        """
+        return next((k for k in keys if k != key), None)
+
+    def _store(self, key, item, weight, ttl=None):
+        """ Save an entry, account for its weight and schedule its expiry
+        """
+        self.cache_data[key] = item
+        self.total_weight += weight - self.weights.get(key, 0)
+        self.weights[key] = weight
+        self.puts += 1
+        self._schedule(key, ttl)
+
+    def _discard(self, key, cause="evicted"):
+        """ Remove an entry for `cause` ("evicted", "expired",
+        "deleted", or "rejected" when an update too heavy to cache
+        replaces it); evicted and expired entries are reported to the
+        listeners, which can still read the deadline of `key`
+        """
+        item = self.cache_data.pop(key)
+        self.total_weight -= self.weights.pop(key)
+        if cause not in ("deleted", "rejected"):
+            if cause == "expired":
+                self.expirations += 1
+            else:
+                self.evictions += 1
+            for callback in self._callbacks:
+                callback(key, item, cause)
+        if key in self.deadlines and key not in self.cache_data:
+            del self.deadlines[key]
+            self.written.pop(key, None)
+            self.scheduled.pop(key, None)
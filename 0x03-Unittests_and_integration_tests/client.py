@@ -8,6 +8,7 @@ from typing import (
 
 from utils import (
     get_json,
+    get_json_pages,
     access_nested_map,
     memoize,
 )
@@ -18,9 +19,10 @@ class GithubOrgClient:
     """
     ORG_URL = "https://api.github.com/orgs/{org}"
 
-    def __init__(self, org_name: str) -> None:
+    def __init__(self, org_name: str, page_workers: int = 8) -> None:
         """Init method of GithubOrgClient"""
         self._org_name = org_name
+        self._page_workers = page_workers
 
     @memoize
     def org(self) -> Dict:
@@ -34,8 +36,8 @@ class GithubOrgClient:
 
     @memoize
     def repos_payload(self) -> Dict:
-        """Memoize repos payload"""
-        return get_json(self._public_repos_url)
+        """Memoize repos payload, every page of it"""
+        return get_json_pages(self._public_repos_url, self._page_workers)
 
     def public_repos(self, license: str = None) -> List[str]:
         """Public repos"""
@@ -0,0 +1,768 @@
+#!/usr/bin/env python3
+"""A module for testing the caching policies.
+"""
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import unittest
+from typing import Hashable, List
+from parameterized import parameterized
+
+BasicCache = __import__('0-basic_cache').BasicCache
+FIFOCache = __import__('1-fifo_cache').FIFOCache
+LIFOCache = __import__('2-lifo_cache').LIFOCache
+LRUCache = __import__('3-lru_cache').LRUCache
+MRUCache = __import__('4-mru_cache').MRUCache
+LFUCache = __import__('100-lfu_cache').LFUCache
+ARCCache = __import__('101-arc_cache').ARCCache
+ShardedCache = __import__('104-concurrent_cache').ShardedCache
+ConcurrentLRUCache = __import__('104-concurrent_cache').ConcurrentLRUCache
+CountMinSketch = __import__('102-tinylfu_cache').CountMinSketch
+DiskTier = __import__('106-tiered_cache').DiskTier
+TieredCache = __import__('106-tiered_cache').TieredCache
+AsyncLoadingCache = __import__('105-cache_loader').AsyncLoadingCache
+LoadingCache = __import__('105-cache_loader').LoadingCache
+WTinyLFUCache = __import__('102-tinylfu_cache').WTinyLFUCache
+snapshots = __import__('107-cache_snapshot')
+simulator = __import__('103-cache_simulator')
+SharedMemoryCache = __import__('108-shared_memory_cache').SharedMemoryCache
+
+
+def replay(cache, trace: List[str]) -> List:
+    """Runs "put key" and "get key" operations on `cache`, returning
+    the keys it evicted, in order."""
+    evicted = []
+    cache.add_listener(lambda key, item, cause: evicted.append(key))
+    for operation in trace:
+        action, key = operation.split()
+        if action == "put":
+            cache.put(key, key.upper())
+        else:
+            cache.get(key)
+    return evicted
+
+
+class FakeClock:
+    """A clock only moving when told to."""
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestExpiry(unittest.TestCase):
+    """Tests the expiry of cache entries."""
+    def setUp(self) -> None:
+        """Sets up a clock and the entries it expires."""
+        self.clock = FakeClock()
+        self.expired = []
+
+    def make_cache(self, **kwargs) -> LRUCache:
+        """Returns an LRU cache on the fake clock."""
+        return LRUCache(
+            clock=self.clock,
+            on_evict=lambda key, item, cause: self.expired.append(
+                (key, cause)),
+            **kwargs
+        )
+
+    def test_lazy_expiry_on_get(self) -> None:
+        """Tests that get() discards an expired entry."""
+        cache = self.make_cache()
+        cache.put("a", 1, ttl=5)
+        self.clock.now = 4.9
+        self.assertEqual(cache.get("a"), 1)
+        self.clock.now = 5
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(self.expired, [("a", "expired")])
+        self.assertEqual(cache.stats()["expirations"], 1)
+
+    def test_purge_on_put(self) -> None:
+        """Tests that put() discards the expired entries first."""
+        cache = self.make_cache(expire_after_write=10)
+        for key in "abcd":
+            cache.put(key, key)
+        self.clock.now = 10
+        cache.put("e", "e")
+        self.assertEqual(list(cache.cache_data), ["e"])
+        self.assertEqual(self.expired, [(key, "expired") for key in "abcd"])
+        self.assertEqual(cache.stats()["evictions"], 0)
+
+    @parameterized.expand([
+        (None, [5, 10, 15, 20], 26),
+        (15, [5, 10], 15),
+    ])
+    def test_access_extension(
+            self,
+            expire_after_write: float,
+            reads: List[float],
+            expires_at: float,
+            ) -> None:
+        """Tests that reads push the access deadline back, but never
+        past the write deadline."""
+        cache = self.make_cache(expire_after_access=6,
+                                expire_after_write=expire_after_write)
+        cache.put("a", "A")
+        for now in reads:
+            self.clock.now = now
+            self.assertEqual(cache.get("a"), "A")
+        self.assertEqual(cache.deadlines["a"], expires_at)
+        self.clock.now = expires_at
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(self.expired, [("a", "expired")])
+
+    def test_heap_bounded(self) -> None:
+        """Tests that evicted entries do not pile up in the heap."""
+        cache = self.make_cache(capacity=4, expire_after_write=3600)
+        for key in range(100000):
+            cache.put(key, key)
+        self.assertEqual(len(cache.cache_data), 4)
+        self.assertLessEqual(len(cache.expiry_heap), 2 * 4 + 64)
+        self.clock.now = 3600
+        cache.purge_expired()
+        self.assertEqual(len(cache.cache_data), 0)
+
+
+class TestEvictionOrder(unittest.TestCase):
+    """Tests the order in which the policies evict keys."""
+    @parameterized.expand([
+        ("least_frequent", ["put a", "put b", "put c", "get a", "get a",
+                            "get b", "put d", "put e", "get b", "put f"],
+         ["c", "d", "e"]),
+        ("recency_tie_break", ["put a", "put b", "put c", "get a",
+                               "get b", "get c", "put d"],
+         ["a"]),
+        ("update_counts", ["put a", "put b", "put c", "put a", "put d"],
+         ["b"]),
+    ])
+    def test_lfu(self, name: str, trace: List[str],
+                 expected: List[str]) -> None:
+        """Tests that `LFUCache` evicts the least frequently used key,
+        the least recently used one among ties."""
+        self.assertEqual(replay(LFUCache(3), trace), expected)
+
+    def test_arc_ghost_hits(self) -> None:
+        """Tests that ghost hits adapt the target size of `t1`."""
+        cache = ARCCache(2)
+        evicted = replay(cache, ["put a", "get a", "put b", "put c"])
+        self.assertEqual(evicted, ["b"])
+        self.assertEqual(list(cache.b1), ["b"])
+        replay(cache, ["put b"])
+        self.assertEqual(evicted, ["b", "a"])
+        self.assertEqual(cache.p, 1)
+        self.assertEqual((list(cache.t1), list(cache.t2)), (["c"], ["b"]))
+        self.assertEqual(list(cache.b2), ["a"])
+        replay(cache, ["put a"])
+        self.assertEqual(evicted, ["b", "a", "c"])
+        self.assertEqual(cache.p, 0)
+        self.assertEqual((list(cache.t1), list(cache.t2)), ([], ["b", "a"]))
+        self.assertEqual((list(cache.b1), list(cache.b2)), (["c"], []))
+
+    def test_arc_full_t1_keeps_no_ghost(self) -> None:
+        """Tests that a miss with `t1` holding the whole capacity drops
+        its least recently used key without a ghost."""
+        cache = ARCCache(2)
+        self.assertEqual(replay(cache, ["put a", "put b", "put c"]), ["a"])
+        self.assertEqual(list(cache.b1), [])
+
+    def test_arc_scan_resistance(self) -> None:
+        """Tests that a scan only flows through `t1`."""
+        scan = ["put s{}".format(number) for number in range(10)]
+        cache = ARCCache(4)
+        evicted = replay(cache, ["put a", "get a", "put b", "get b"] + scan)
+        self.assertEqual(evicted, ["s{}".format(n) for n in range(8)])
+        self.assertEqual(list(cache.t2), ["a", "b"])
+
+    @parameterized.expand([
+        ("candidate_rejected", 0, [9]),
+        ("candidate_admitted", 2, [0]),
+    ])
+    def test_tinylfu_admission(self, name: str, reads: int,
+                               expected: List[int]) -> None:
+        """Tests the duel between the window's victim and the main
+        victim: the window's one must be seen more often to get in."""
+        cache = WTinyLFUCache(10)
+        for key in range(10):
+            cache.put(key, key)
+        self.assertEqual(list(cache.window), [9])
+        self.assertEqual(list(cache.probation), list(range(9)))
+        for _ in range(reads):
+            cache.get(9)
+        evicted = []
+        cache.add_listener(lambda key, item, cause: evicted.append(key))
+        cache.put(100, 100)
+        self.assertEqual(evicted, expected)
+        self.assertEqual(list(cache.window), [100])
+        self.assertEqual(9 in cache.probation, bool(reads))
+
+    def test_sketch_ageing(self) -> None:
+        """Tests that the sketch halves its counters once it has seen
+        `sample_size` accesses."""
+        sketch = CountMinSketch(16)
+        for _ in range(20):
+            sketch.increment(1)
+        self.assertEqual(sketch.frequency(1), CountMinSketch.MAX_COUNT)
+        sketch.increment(2, sketch.sample_size - sketch.additions - 1)
+        self.assertEqual(sketch.frequency(1), 15)
+        sketch.increment(3)
+        self.assertEqual(sketch.frequency(1), 7)
+        self.assertEqual(sketch.additions, sketch.sample_size // 2)
+
+
+class TestShardedCache(unittest.TestCase):
+    """Tests how `ShardedCache` splits its budgets."""
+    @parameterized.expand([
+        (4, 16, None, 1),
+        (17, 16, None, 2),
+        (1000, 16, None, 16),
+        (100, 16, 10, 4),
+    ])
+    def test_shard_count(
+            self,
+            capacity: int,
+            shards: int,
+            max_weight: int,
+            expected: int,
+            ) -> None:
+        """Tests that small budgets use fewer shards, and that the
+        capacity is split exactly."""
+        cache = ShardedCache(capacity, shards, LRUCache,
+                             max_weight=max_weight)
+        self.assertEqual(len(cache.shards), expected)
+        self.assertEqual(
+            sum(shard.capacity for shard in cache.shards), capacity)
+
+    def test_capacity(self) -> None:
+        """Tests that the cache never holds more than its capacity."""
+        cache = ShardedCache(17, policy=LRUCache)
+        for key in range(1000):
+            cache.put(key, key)
+        self.assertEqual(cache.stats()["size"], 17)
+
+    def test_weight_budget(self) -> None:
+        """Tests that small entries fill a small weight budget."""
+        cache = ShardedCache(100, policy=LRUCache, max_weight=10)
+        for key in range(1000):
+            cache.put(key, key)
+        self.assertGreaterEqual(cache.stats()["size"], 8)
+        self.assertLessEqual(cache.stats()["weight"], 10)
+
+    def test_large_entry(self) -> None:
+        """Tests that an entry of a tenth of the budget is cached."""
+        cache = ShardedCache(1000, policy=LRUCache, max_weight=1 << 20,
+                             weigher=lambda key, item: len(item))
+        cache.put("big", b"x" * 100000)
+        self.assertEqual(len(cache.get("big")), 100000)
+
+
+class StaleCache(LRUCache):
+    """An LRU cache whose first read misses, like a read racing the
+    put of a concurrent load."""
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.stale_reads = 1
+
+    def get(self, key: Hashable):
+        if self.stale_reads:
+            self.stale_reads -= 1
+            return None
+        return super().get(key)
+
+
+class TestLoadingCache(unittest.TestCase):
+    """Tests the `LoadingCache` class."""
+    def test_coalescing(self) -> None:
+        """Tests that concurrent misses share one load."""
+        calls = []
+
+        def loader(key):
+            calls.append(key)
+            time.sleep(0.05)
+            return key.upper()
+        cache = LoadingCache(ConcurrentLRUCache(64), loader)
+        results = []
+        threads = [threading.Thread(
+            target=lambda: results.append(cache.get_or_load("a")))
+            for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(calls, ["a"])
+        self.assertEqual(results, ["A"] * 8)
+        self.assertEqual(cache.in_flight, {})
+
+    def test_exception_fan_out(self) -> None:
+        """Tests that every waiter gets the error, and that a failed
+        load is retried."""
+        started = threading.Event()
+        release = threading.Event()
+
+        def failing(key):
+            started.set()
+            release.wait()
+            raise KeyError(key)
+        cache = LoadingCache(ConcurrentLRUCache(64), failing)
+        errors = []
+
+        def load():
+            try:
+                cache.get_or_load("a")
+            except KeyError as error:
+                errors.append(error)
+        leader = threading.Thread(target=load)
+        leader.start()
+        started.wait()
+        waiters = [threading.Thread(target=load) for _ in range(4)]
+        for waiter in waiters:
+            waiter.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in [leader] + waiters:
+            thread.join()
+        self.assertEqual(len(errors), 5)
+        self.assertEqual(cache.get_or_load("a", lambda key: "A"), "A")
+
+    def test_load_landed_before_lock(self) -> None:
+        """Tests that a miss racing a finished load does not load
+        again."""
+        calls = []
+        stale = StaleCache(64)
+        stale.put("a", "A")
+        cache = LoadingCache(stale, lambda key: calls.append(key) or "B")
+        self.assertEqual(cache.get_or_load("a"), "A")
+        self.assertEqual(calls, [])
+
+
+class TestAsyncLoadingCache(unittest.IsolatedAsyncioTestCase):
+    """Tests the `AsyncLoadingCache` class."""
+    async def test_coalescing(self) -> None:
+        """Tests that concurrent misses share one load."""
+        calls = []
+
+        async def loader(key):
+            calls.append(key)
+            await asyncio.sleep(0.01)
+            return key.upper()
+        cache = AsyncLoadingCache(LRUCache(64), loader)
+        results = await asyncio.gather(
+            *(cache.get_or_load("a") for _ in range(8)))
+        self.assertEqual(calls, ["a"])
+        self.assertEqual(results, ["A"] * 8)
+        self.assertEqual(await cache.get_or_load("a"), "A")
+        self.assertEqual(cache.in_flight, {})
+
+    async def test_exception_fan_out(self) -> None:
+        """Tests that every waiter gets the error, and that a failed
+        load is retried."""
+        async def failing(key):
+            await asyncio.sleep(0.01)
+            raise KeyError(key)
+        cache = AsyncLoadingCache(LRUCache(64), failing)
+        results = await asyncio.gather(
+            *(cache.get_or_load("a") for _ in range(4)),
+            return_exceptions=True)
+        self.assertTrue(all(isinstance(result, KeyError)
+                            for result in results))
+
+        async def loader(key):
+            return key.upper()
+        self.assertEqual(await cache.get_or_load("a", loader), "A")
+
+    async def test_cancelled_waiter(self) -> None:
+        """Tests that cancelling one waiter leaves the load running for
+        the others."""
+        calls = []
+
+        async def loader(key):
+            calls.append(key)
+            await asyncio.sleep(0.01)
+            return key.upper()
+        cache = AsyncLoadingCache(LRUCache(64), loader)
+        first = asyncio.ensure_future(cache.get_or_load("a"))
+        second = asyncio.ensure_future(cache.get_or_load("a"))
+        await asyncio.sleep(0)
+        first.cancel()
+        self.assertEqual(await second, "A")
+        self.assertTrue(first.cancelled())
+        self.assertEqual(calls, ["a"])
+
+
+class TestListeners(unittest.TestCase):
+    """Tests the eviction listeners."""
+    @parameterized.expand([
+        ("with_cause", lambda calls: lambda key, item, cause: calls.append(
+            (key, item, cause)), [("a", "A", "evicted")]),
+        ("without_cause", lambda calls: lambda key, item: calls.append(
+            (key, item)), [("a", "A")]),
+    ])
+    def test_listener(self, name: str, make_listener, expected) -> None:
+        """Tests that listeners with and without the cause argument are
+        called on evictions, until removed."""
+        calls = []
+        listener = make_listener(calls)
+        cache = LRUCache(1, on_evict=listener)
+        cache.put("a", "A")
+        cache.put("b", "B")
+        cache.delete("b")
+        self.assertEqual(calls, expected)
+        cache.remove_listener(listener)
+        cache.put("c", "C")
+        cache.put("d", "D")
+        self.assertEqual(calls, expected)
+
+
+class TestTieredCache(unittest.TestCase):
+    """Tests the `TieredCache` class."""
+    def setUp(self) -> None:
+        """Sets up a memory tier weighing items by length over a disk
+        tier in a temporary file."""
+        self.clock = FakeClock()
+        self.directory = tempfile.TemporaryDirectory()
+        self.memory = LRUCache(2, max_weight=10, clock=self.clock,
+                               weigher=lambda key, item: len(item))
+        self.cache = TieredCache(self.memory, DiskTier(
+            os.path.join(self.directory.name, "tier.sqlite"),
+            clock=self.clock))
+
+    def tearDown(self) -> None:
+        """Closes the disk tier."""
+        self.cache.close()
+        self.directory.cleanup()
+
+    def test_demotion_and_promotion(self) -> None:
+        """Tests that evicted entries move to disk and back."""
+        for key in "abc":
+            self.cache.put(key, key.upper())
+        self.assertEqual(list(self.memory.cache_data), ["c", "b"])
+        self.assertEqual(len(self.cache.disk), 1)
+        self.assertEqual(self.cache.get("a"), "A")
+        self.assertIn("a", self.memory.cache_data)
+        self.assertEqual(self.cache.stats()["disk_hits"], 1)
+
+    def test_expired_on_disk(self) -> None:
+        """Tests that a demoted entry expires on disk."""
+        self.cache.put("a", "A", ttl=5)
+        self.cache.put("b", "B")
+        self.cache.put("c", "C")
+        self.assertEqual(len(self.cache.disk), 1)
+        self.clock.now = 100
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(len(self.cache.disk), 0)
+        self.assertEqual(self.cache.stats()["disk_misses"], 1)
+
+    def test_promotion_keeps_ttl(self) -> None:
+        """Tests that a promoted entry keeps the time it had left."""
+        self.cache.put("a", "A", ttl=5)
+        self.cache.put("b", "B")
+        self.cache.put("c", "C")
+        self.clock.now = 2
+        self.assertEqual(self.cache.get("a"), "A")
+        self.assertEqual(self.memory.deadlines["a"], 5)
+        self.clock.now = 6
+        self.assertIsNone(self.cache.get("a"))
+
+    def test_rejected_update(self) -> None:
+        """Tests that an update too heavy for memory drops the old
+        value instead of demoting it."""
+        self.cache.put("k", "old")
+        self.cache.put("k", "x" * 50)
+        self.assertIsNone(self.cache.get("k"))
+        self.assertEqual(len(self.cache.disk), 0)
+        self.assertEqual(self.memory.stats()["evictions"], 0)
+
+
+POLICIES = [(policy.__name__, policy) for policy in (
+    BasicCache, FIFOCache, LIFOCache, LRUCache, MRUCache,
+    LFUCache, ARCCache, WTinyLFUCache)]
+WARM_UP = ["put a", "put b", "get a", "put c", "get a", "put d",
+           "get c", "put e", "get e", "put f", "put b", "get b"]
+FOLLOW_UP = ["put g", "get d", "put h", "get a", "put c", "put i",
+             "get f", "put j", "get b", "put k"]
+
+
+class TestSnapshots(unittest.TestCase):
+    """Tests the snapshots of the caching policies."""
+    @parameterized.expand(POLICIES)
+    def test_round_trip(self, _, policy: type) -> None:
+        """Tests that a restored cache keeps the order, the policy
+        metadata and the time left of the entries, and evicts the same
+        keys afterwards."""
+        clock = FakeClock()
+        cache = policy(4, clock=clock)
+        replay(cache, WARM_UP)
+        cache.put("t", "T", ttl=10)
+        clock.now = 3
+        copy = policy(4, clock=clock)
+        snapshots.loads(copy, snapshots.dumps(cache))
+        self.assertEqual(list(copy.cache_data.items()),
+                         list(cache.cache_data.items()))
+        self.assertEqual(copy.snapshot()["entries"],
+                         cache.snapshot()["entries"])
+        self.assertEqual(copy.deadlines, cache.deadlines)
+        if policy is WTinyLFUCache:
+            return
+        self.assertEqual(copy._policy_state(), cache._policy_state())
+        self.assertEqual(replay(copy, FOLLOW_UP),
+                         replay(cache, FOLLOW_UP))
+        self.assertEqual(list(copy.cache_data), list(cache.cache_data))
+
+    def test_lfu_buckets(self) -> None:
+        """Tests that the LFU frequency buckets are restored."""
+        cache = LFUCache(4)
+        replay(cache, ["put a", "put b", "get a", "get a", "put c",
+                       "get b"])
+        copy = LFUCache(4)
+        copy.restore(cache.snapshot())
+        self.assertEqual({freq: list(keys)
+                          for freq, keys in copy.freq_keys.items()},
+                         {0: ["c"], 1: ["b"], 2: ["a"]})
+        self.assertEqual(copy.keys_freq, {"a": 2, "b": 1, "c": 0})
+        self.assertEqual(copy.min_freq, 0)
+
+    def test_arc_lists(self) -> None:
+        """Tests that the ARC lists and target size are restored."""
+        cache = ARCCache(2)
+        replay(cache, ["put a", "get a", "put b", "put c", "put b"])
+        copy = ARCCache(2)
+        copy.restore(cache.snapshot())
+        for name in ("t1", "t2", "b1", "b2", "p"):
+            self.assertEqual(getattr(copy, name), getattr(cache, name))
+        self.assertTrue(copy.b1 or copy.b2)
+
+    def test_tinylfu_segments(self) -> None:
+        """Tests that the W-TinyLFU segments are restored and that the
+        replayed sketch does not underestimate any frequency."""
+        cache = WTinyLFUCache(4)
+        replay(cache, WARM_UP)
+        copy = WTinyLFUCache(4)
+        copy.restore(cache.snapshot())
+        state = cache._policy_state()
+        for name in ("window", "probation", "protected"):
+            self.assertEqual(getattr(copy, name), getattr(cache, name))
+        for key, count in state["frequencies"]:
+            self.assertGreaterEqual(copy.sketch.frequency(key), count)
+
+    def test_ttl(self) -> None:
+        """Tests that entries keep the time they had left, not their
+        clock readings."""
+        clock = FakeClock()
+        cache = LRUCache(4, clock=clock)
+        cache.put("a", "A", ttl=10)
+        cache.put("b", "B")
+        clock.now = 4
+        state = cache.snapshot()
+        later = FakeClock()
+        later.now = 1000
+        copy = LRUCache(4, clock=later)
+        copy.restore(state)
+        self.assertEqual(copy.deadlines, {"a": 1006})
+        later.now = 1005
+        self.assertEqual(copy.get("a"), "A")
+        later.now = 1006
+        self.assertIsNone(copy.get("a"))
+        self.assertEqual(copy.get("b"), "B")
+
+    @parameterized.expand(POLICIES)
+    def test_restore_into_smaller(self, _, policy: type) -> None:
+        """Tests that a snapshot larger than the cache is trimmed,
+        except by the unbounded `BasicCache`."""
+        cache = policy(8)
+        replay(cache, ["put {}".format(key) for key in "abcdef"])
+        copy = policy(4)
+        copy.restore(cache.snapshot())
+        size = 6 if policy is BasicCache else 4
+        self.assertEqual(len(copy.cache_data), size)
+        self.assertEqual(len(copy.weights), size)
+
+
+class TestSharedMemoryCache(unittest.TestCase):
+    """Tests the `SharedMemoryCache` class."""
+    def setUp(self) -> None:
+        """Sets up a small cache under a name of its own."""
+        self.name = "test_shm_{}_{}".format(os.getpid(), id(self))
+        self.cache = SharedMemoryCache(self.name, sets=4, ways=2,
+                                       slot_size=128)
+
+    def tearDown(self) -> None:
+        """Destroys the block."""
+        self.cache.close()
+        self.cache.unlink()
+
+    def test_oversized_update(self) -> None:
+        """Tests that an item too large for a slot removes the cached
+        item of its key."""
+        self.cache.put("k", "old")
+        self.assertEqual(self.cache.get("k"), "old")
+        self.cache.put("k", "x" * 500)
+        self.assertIsNone(self.cache.get("k"))
+
+    @parameterized.expand([(0,), (256,)])
+    def test_ways_out_of_range(self, ways: int) -> None:
+        """Tests that a set cannot have more ways than a one-byte
+        CLOCK hand can point to."""
+        with self.assertRaises(ValueError):
+            SharedMemoryCache(self.name + "_ways", sets=1, ways=ways)
+
+    def test_full_set_eviction(self) -> None:
+        """Tests that the CLOCK hand wraps around the widest set."""
+        self.tearDown()
+        self.cache = SharedMemoryCache(self.name, sets=1, ways=255,
+                                       slot_size=64)
+        for number in range(400):
+            self.cache.put(number, number)
+        self.assertEqual(self.cache.stats()["size"], 255)
+        self.assertEqual(self.cache.stats()["evictions"], 145)
+        self.assertEqual(self.cache.get(399), 399)
+
+    def test_concurrent_attach(self) -> None:
+        """Tests that caches attaching while the block is created only
+        see it once its header is written."""
+        self.tearDown()
+        barrier = threading.Barrier(8)
+        caches, errors = [], []
+
+        def attach() -> None:
+            barrier.wait()
+            try:
+                caches.append(SharedMemoryCache(self.name, sets=4, ways=2,
+                                                slot_size=128))
+            except ValueError as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=attach) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(sum(cache.created for cache in caches), 1)
+        self.cache = next(cache for cache in caches if cache.created)
+        for cache in caches:
+            if cache is not self.cache:
+                cache.close()
+        self.assertEqual(self.cache.sets, 4)
+
+
+class CountingClock(FakeClock):
+    """A fake clock counting how often it is read."""
+    def __init__(self) -> None:
+        super().__init__()
+        self.reads = 0
+
+    def __call__(self) -> float:
+        self.reads += 1
+        return self.now
+
+
+class TestBatchOperations(unittest.TestCase):
+    """Tests `get_many`, `put_many` and `delete_many`."""
+    @parameterized.expand(POLICIES)
+    def test_same_as_one_by_one(self, _, policy: type) -> None:
+        """Tests that random batches give the results, evictions and
+        counters of the same calls made one by one."""
+        rng = random.Random(policy.__name__)
+        caches, discards = [], []
+        for _ in range(2):
+            discarded = []
+            cache = policy(4, clock=FakeClock(), max_weight=12,
+                           weigher=lambda key, item: len(item))
+            cache.add_listener(lambda key, item, cause, discarded=discarded:
+                               discarded.append((key, cause)))
+            caches.append(cache)
+            discards.append(discarded)
+        batched, single = caches
+        for _ in range(300):
+            keys = [rng.choice("abcdefghij")
+                    for _ in range(rng.randint(1, 5))]
+            action = rng.choice(["put", "get", "delete", "tick"])
+            if action == "put":
+                pairs = [(key, key * rng.randint(1, 4)) for key in keys]
+                ttl = rng.choice([None, 1, 5])
+                batched.put_many(pairs, ttl)
+                for key, item in pairs:
+                    single.put(key, item, ttl)
+            elif action == "get":
+                self.assertEqual(batched.get_many(keys),
+                                 [single.get(key) for key in keys])
+            elif action == "delete":
+                self.assertEqual(batched.delete_many(keys),
+                                 sum(single.delete(key) for key in keys))
+            else:
+                for cache in caches:
+                    cache.clock.now += 1
+            self.assertEqual(list(batched.cache_data.items()),
+                             list(single.cache_data.items()))
+        self.assertEqual(discards[0], discards[1])
+        self.assertEqual(batched.stats(), single.stats())
+
+    def test_put_many_reads_clock_once(self) -> None:
+        """Tests that a batch of puts reads the clock once."""
+        clock = CountingClock()
+        cache = LRUCache(8, clock=clock, expire_after_write=10)
+        cache.put_many({key: key for key in "abcdefghijkl"})
+        self.assertEqual(clock.reads, 1)
+        self.assertEqual(set(cache.deadlines.values()), {10})
+        clock.now = 10
+        cache.put_many([("m", "M"), ("n", "N")], ttl=1)
+        self.assertEqual(clock.reads, 2)
+        self.assertEqual(list(cache.cache_data), ["n", "m"])
+        self.assertEqual(cache.stats()["expirations"], 8)
+
+
+class TestSimulator(unittest.TestCase):
+    """Tests the trace-driven cache simulator."""
+    @parameterized.expand([(name,) for name in simulator.POLICIES])
+    def test_loop_within_capacity(self, policy: str) -> None:
+        """Tests that a loop over fewer keys than the capacity only
+        misses on its first pass."""
+        result = simulator.simulate(policy, 20,
+                                    simulator.loop_trace(100, keys=10))
+        self.assertEqual(set(result), {
+            "policy", "capacity", "ops", "hit_ratio", "evictions",
+            "ops_per_sec", "p50_ns", "p99_ns"})
+        self.assertEqual(result["policy"], policy)
+        self.assertEqual(result["capacity"], 20)
+        self.assertEqual(result["ops"], 100)
+        self.assertEqual(result["hit_ratio"], 0.9)
+        self.assertEqual(result["evictions"], 0)
+        self.assertLessEqual(result["p50_ns"], result["p99_ns"])
+
+    def test_scan(self) -> None:
+        """Tests that a scan never hits."""
+        result = simulator.simulate("LRUCache", 10,
+                                    simulator.scan_trace(50))
+        self.assertEqual(result["hit_ratio"], 0.0)
+        self.assertEqual(result["evictions"], 40)
+
+    @parameterized.expand([
+        ([], 0.5, 0),
+        ([5], 0.99, 5),
+        (list(range(1, 101)), 0.5, 50),
+        (list(range(1, 101)), 0.99, 99),
+        (list(range(1, 101)), 1.0, 100),
+    ])
+    def test_percentile(self, ordered: List[int], fraction: float,
+                        expected: int) -> None:
+        """Tests the nearest-rank percentile."""
+        self.assertEqual(simulator.percentile(ordered, fraction), expected)
+
+    def test_main(self) -> None:
+        """Tests that main prints one JSON object per policy."""
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            simulator.main(["--policy", "LRUCache", "--policy", "LFUCache",
+                            "--trace", "zipf", "--length", "1000",
+                            "--capacity", "50"])
+        results = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([result["policy"] for result in results],
+                         ["LRUCache", "LFUCache"])
+        self.assertTrue(all(result["trace"] == "zipf" and
+                            result["ops"] == 1000 for result in results))
@@ -50,7 +50,7 @@ class TestGithubOrgClient(unittest.TestCase):
                 "https://api.github.com/users/google/repos",
             )
 
-    @patch("client.get_json")
+    @patch("client.get_json_pages")
     def test_public_repos(self, mock_get_json: MagicMock) -> None:
         """Tests the `public_repos` method."""
         test_payload = {
@@ -104,7 +104,7 @@ class TestGithubOrgClient(unittest.TestCase):
                 ],
             )
             mock_public_repos_url.assert_called_once()
-        mock_get_json.assert_called_once()
+        mock_get_json.assert_called_once_with(test_payload["repos_url"], 8)
 
     @parameterized.expand([
         ({'license': {'key': "bsd-3-clause"}}, "bsd-3-clause", True),
@@ -135,12 +135,15 @@ class TestIntegrationGithubOrgClient(unittest.TestCase):
             'https://api.github.com/orgs/google/repos': cls.repos_payload,
         }
 
-        def get_payload(url):
+        def get_payload(url, **kwargs):
             if url in route_payload:
                 return Mock(**{'json.return_value': route_payload[url]})
             return HTTPError
 
-        cls.get_patcher = patch("requests.get", side_effect=get_payload)
+        cls.get_patcher = patch(
+            "requests.Session.get",
+            side_effect=get_payload,
+        )
         cls.get_patcher.start()
 
     def test_public_repos(self) -> None:
@@ -1,14 +1,26 @@
 #!/usr/bin/env python3
 """A module for testing the utils module.
 """
+import json
+import os
+import tempfile
+import threading
+import time
 import unittest
-from typing import Dict, Tuple, Union
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple, Union
 from unittest.mock import patch, Mock
+from urllib.parse import parse_qs, urlsplit
 from parameterized import parameterized
 
 from utils import (
     access_nested_map,
+    cached,
+    configure_http_cache,
+    configure_session,
     get_json,
+    get_json_pages,
+    get_session,
     memoize,
 )
 
@@ -57,9 +69,177 @@ class TestGetJson(unittest.TestCase):
             ) -> None:
         """Tests `get_json`'s output."""
         attrs = {'json.return_value': test_payload}
-        with patch("requests.get", return_value=Mock(**attrs)) as req_get:
+        with patch(
+                "requests.Session.get",
+                return_value=Mock(**attrs),
+                ) as req_get:
             self.assertEqual(get_json(test_url), test_payload)
-            req_get.assert_called_once_with(test_url)
+            req_get.assert_called_once_with(test_url, timeout=(3.05, 30))
+
+
+class TestGetSession(unittest.TestCase):
+    """Tests the `get_session` function."""
+    def tearDown(self) -> None:
+        """Restores the default session settings."""
+        configure_session()
+
+    def test_get_session(self) -> None:
+        """Tests that threads share one session."""
+        sessions = []
+        threads = [
+            threading.Thread(target=lambda: sessions.append(get_session()))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(set(map(id, sessions))), 1)
+        self.assertIs(sessions[0], get_session())
+
+    def test_configure_session(self) -> None:
+        """Tests `configure_session`'s pool size and timeout."""
+        old_session = get_session()
+        configure_session(pool_maxsize=4, timeout=5)
+        session = get_session()
+        self.assertIsNot(session, old_session)
+        self.assertEqual(
+            session.get_adapter("https://api.github.com")._pool_maxsize,
+            4,
+        )
+        attrs = {'json.return_value': {}}
+        with patch(
+                "requests.Session.get",
+                return_value=Mock(**attrs),
+                ) as req_get:
+            get_json("https://api.github.com")
+            req_get.assert_called_once_with(
+                "https://api.github.com", timeout=5)
+
+
+class TestHttpCache(unittest.TestCase):
+    """Tests `get_json` with the HTTP cache, against a local server."""
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Starts a server answering with an ETag."""
+        cls.requests = []
+        body = json.dumps({"login": "google"}).encode()
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                cls.requests.append(self.headers.get("If-None-Match"))
+                if self.headers.get("If-None-Match") == '"v1"':
+                    self.send_response(304)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("ETag", '"v1"')
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = "http://127.0.0.1:{}/orgs/google".format(
+            cls.server.server_port)
+
+    def setUp(self) -> None:
+        """Uses a new cache file."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "http.sqlite")
+        self.requests.clear()
+
+    def tearDown(self) -> None:
+        """Disables the cache."""
+        configure_http_cache(None)
+        self.directory.cleanup()
+
+    def test_fresh_response(self) -> None:
+        """Tests that a fresh response is reused across runs."""
+        configure_http_cache(self.path, ttl=60)
+        self.assertEqual(get_json(self.url), {"login": "google"})
+        configure_http_cache(self.path, ttl=60)
+        self.assertEqual(get_json(self.url), {"login": "google"})
+        self.assertEqual(self.requests, [None])
+
+    def test_revalidation(self) -> None:
+        """Tests that a stale response is revalidated with its ETag."""
+        configure_http_cache(self.path, ttl=0)
+        self.assertEqual(get_json(self.url), {"login": "google"})
+        self.assertEqual(get_json(self.url), {"login": "google"})
+        self.assertEqual(self.requests, [None, '"v1"'])
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        """Stops the server."""
+        cls.server.shutdown()
+        cls.server.server_close()
+
+
+class TestGetJsonPages(unittest.TestCase):
+    """Tests the `get_json_pages` function, against a local server."""
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Starts a server paginating 8 repos 2 per page."""
+        cls.lock = threading.Lock()
+        cls.in_flight = 0
+        cls.max_in_flight = 0
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                with cls.lock:
+                    cls.in_flight += 1
+                    cls.max_in_flight = max(cls.max_in_flight,
+                                            cls.in_flight)
+                query = parse_qs(urlsplit(self.path).query)
+                page = int(query.get("page", ["1"])[0])
+                if page == 2:
+                    time.sleep(0.2)
+                body = json.dumps([
+                    {"name": "repo{}".format(2 * page - 1)},
+                    {"name": "repo{}".format(2 * page)},
+                ]).encode()
+                self.send_response(200)
+                self.send_header("Link", (
+                    '<{0}?per_page=2&page={1}>; rel="next", '
+                    '<{0}?per_page=2&page=4>; rel="last"'
+                ).format(cls.url, page + 1))
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                with cls.lock:
+                    cls.in_flight -= 1
+
+            def log_message(self, *args):
+                pass
+
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = "http://127.0.0.1:{}/orgs/google/repos".format(
+            cls.server.server_port)
+
+    def test_get_json_pages(self) -> None:
+        """Tests that pages are fetched concurrently, in page order."""
+        repos = get_json_pages(self.url, workers=3)
+        self.assertEqual(
+            [repo["name"] for repo in repos],
+            ["repo{}".format(number) for number in range(1, 9)],
+        )
+        self.assertGreater(self.max_in_flight, 1)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        """Stops the server."""
+        cls.server.shutdown()
+        cls.server.server_close()
 
 
 class TestMemoize(unittest.TestCase):
@@ -82,3 +262,46 @@ class TestMemoize(unittest.TestCase):
             self.assertEqual(test_class.a_property(), 42)
             self.assertEqual(test_class.a_property(), 42)
             memo_fxn.assert_called_once()
+
+
+class TestCached(unittest.TestCase):
+    """Tests the `cached` function."""
+    def test_cached(self) -> None:
+        """Tests `cached`'s output."""
+        calls = []
+
+        @cached()
+        def add(a, b=0):
+            calls.append((a, b))
+            return a + b
+        self.assertEqual(add(1, b=2), 3)
+        self.assertEqual(add(1, b=2), 3)
+        self.assertEqual(add(1), 1)
+        self.assertEqual(add(1), 1)
+        self.assertEqual(calls, [(1, 2), (1, 0)])
+        self.assertEqual(add.cache_info()["hits"], 2)
+        add.cache_clear()
+        self.assertEqual(add(1), 1)
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(add.cache_info()["misses"], 1)
+
+    @parameterized.expand([
+        ("3-lru_cache", "LRUCache", ["a", "b", "c", "a"]),
+        ("100-lfu_cache", "LFUCache", ["a", "b", "c", "b"]),
+    ])
+    def test_cached_policy(
+            self,
+            module: str,
+            policy: str,
+            expected: List[str],
+            ) -> None:
+        """Tests `cached` with a bounded policy."""
+        calls = []
+
+        @cached(getattr(__import__(module), policy), capacity=2)
+        def echo(value):
+            calls.append(value)
+            return None
+        for value in ("a", "a", "b", "c", "b", "a"):
+            self.assertIsNone(echo(value))
+        self.assertEqual(calls, expected)
@@ -1,21 +1,36 @@
 #!/usr/bin/env python3
 """Generic utilities for github org client.
 """
+import json
+import os
 import requests
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from functools import wraps
+from urllib.parse import parse_qs, urlencode, urlsplit, urlunsplit
 from typing import (
     Mapping,
     Sequence,
     Any,
     Dict,
     Callable,
+    List,
+    Optional,
+    Tuple,
+    Union,
 )
 
 
 __all__ = [
     "access_nested_map",
     "get_json",
+    "get_json_pages",
+    "get_session",
+    "configure_session",
+    "configure_http_cache",
     "memoize",
+    "cached",
 ]
 
 
@@ -41,11 +56,175 @@ def access_nested_map(nested_map: Mapping, path: Sequence) -> Any:
     return nested_map
 
 
+_session_lock = threading.Lock()
+_session = None
+_session_options = {
+    "pool_connections": 10,
+    "pool_maxsize": 10,
+    "pool_block": False,
+    "timeout": (3.05, 30),
+}
+
+
+def get_session() -> requests.Session:
+    """Get the process-wide HTTP session.
+    Its connection pools keep connections alive across calls, so every
+    `get_json` to a host already contacted skips the TCP and TLS
+    handshakes. The session is shared by all threads; a forked child
+    starts a new one instead of sharing the parent's sockets.
+    """
+    global _session
+    session = _session
+    if session is None:
+        with _session_lock:
+            session = _session
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=_session_options["pool_connections"],
+                    pool_maxsize=_session_options["pool_maxsize"],
+                    pool_block=_session_options["pool_block"],
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return session
+
+
+def configure_session(
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        timeout: Union[float, Tuple[float, float], None] = (3.05, 30),
+        ) -> None:
+    """Configure the process-wide HTTP session.
+    Parameters
+    ----------
+    pool_connections: int
+        Number of hosts whose connection pool is kept
+    pool_maxsize: int
+        Connections kept alive per host, i.e. the useful number of
+        threads fetching from one host at once
+    pool_block: bool
+        Whether a thread waits for a free connection instead of opening
+        a throwaway one when a host's pool is exhausted
+    timeout: float or (connect, read) tuple
+        Timeout of every request, in seconds; None waits forever
+    """
+    global _session
+    with _session_lock:
+        _session_options.update(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            timeout=timeout,
+        )
+        session, _session = _session, None
+    if session is not None:
+        session.close()
+
+
+_http_cache = None
+
+
+def configure_http_cache(path: str = None, ttl: float = 60.0) -> None:
+    """Keep the responses fetched by `get_json` in a SQLite file.
+    Parameters
+    ----------
+    path: str
+        SQLite file of the cache, shared by every run using it; None
+        disables the cache
+    ttl: float
+        Seconds a response is used without a request; past them, it is
+        revalidated with its ETag or Last-Modified date and reused if
+        the server answers 304 Not Modified
+    """
+    global _http_cache
+    http_cache = None
+    if path is not None:
+        http_cache = __import__('109-http_cache').HTTPCache(path, ttl)
+    http_cache, _http_cache = _http_cache, http_cache
+    if http_cache is not None:
+        http_cache.close()
+
+
+def _forget_session() -> None:
+    """Drop the parent's session and cache connection in a forked child."""
+    global _session, _session_lock, _http_cache
+    _session = None
+    _session_lock = threading.Lock()
+    if _http_cache is not None:
+        _http_cache = __import__('109-http_cache').HTTPCache(
+            _http_cache.path, _http_cache.ttl)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_session)
+
+
+def _get_page(url: str) -> Tuple[Any, Optional[str]]:
+    """Get JSON from remote URL along with the response's Link header.
+    """
+    session = get_session()
+    timeout = _session_options["timeout"]
+    http_cache = _http_cache
+    if http_cache is not None:
+        body, link = http_cache.fetch(session, url, timeout=timeout)
+        return json.loads(body), link
+    response = session.get(url, timeout=timeout)
+    return response.json(), response.headers.get("Link")
+
+
 def get_json(url: str) -> Dict:
     """Get JSON from remote URL.
     """
-    response = requests.get(url)
-    return response.json()
+    return _get_page(url)[0]
+
+
+def _page_urls(link: Optional[str]) -> List[str]:
+    """URLs of pages 2 to last of a paginated resource, built from the
+    rel="last" URL of the first page's Link header.
+    """
+    if not isinstance(link, str):
+        return []
+    last = next((page["url"] for page in
+                 requests.utils.parse_header_links(link)
+                 if page.get("rel") == "last"), None)
+    if last is None:
+        return []
+    parts = urlsplit(last)
+    query = parse_qs(parts.query)
+    try:
+        pages = int(query["page"][0])
+    except (KeyError, ValueError):
+        return []
+    urls = []
+    for page in range(2, pages + 1):
+        query["page"] = [str(page)]
+        urls.append(urlunsplit(
+            parts._replace(query=urlencode(query, doseq=True))))
+    return urls
+
+
+def get_json_pages(url: str, workers: int = 8) -> List:
+    """Get every page of a paginated JSON list, merged in page order.
+    The first page's Link header tells the number of pages, and the
+    remaining ones are fetched by up to `workers` threads at once over
+    the pooled session.
+    Example
+    -------
+    >>> repos = get_json_pages("https://api.github.com/orgs/google/repos")
+    >>> [repo["name"] for repo in repos[:2]]
+    ['truth', 'ruby-openid-apps-discovery']
+    """
+    payload, link = _get_page(url)
+    urls = _page_urls(link)
+    if not urls or not isinstance(payload, list):
+        return payload
+    with ThreadPoolExecutor(max(1, min(workers, len(urls)))) as pool:
+        for page in pool.map(get_json, urls):
+            payload.extend(page)
+    return payload
 
 
 def memoize(fn: Callable) -> Callable:
@@ -74,3 +253,82 @@ def memoize(fn: Callable) -> Callable:
         return getattr(self, attr_name)
 
     return property(memoized)
+
+
+_KWARGS_MARK = object()
+_NONE = object()
+
+
+def cached(
+        policy: Callable = None,
+        capacity: int = 128,
+        ttl: float = None,
+        ) -> Callable:
+    """Decorator to memoize a function in a caching policy.
+    Parameters
+    ----------
+    policy: Callable
+        A cache class (or factory) taking the capacity, such as
+        `LFUCache` or `ARCCache`; `LRUCache` when not given
+    capacity: int
+        Number of results kept
+    ttl: float
+        Seconds after which a result is computed again
+    Example
+    -------
+    ARCCache = __import__('101-arc_cache').ARCCache
+    @cached(ARCCache, capacity=256, ttl=60)
+    def fetch(url):
+        print("fetch called")
+        return get_json(url)
+    >>> fetch("https://api.github.com/orgs/google")
+    fetch called
+    {...}
+    >>> fetch("https://api.github.com/orgs/google")
+    {...}
+    >>> fetch.cache_info()["hits"]
+    1
+    """
+    if policy is None:
+        policy = __import__('3-lru_cache').LRUCache
+
+    def decorator(fn: Callable) -> Callable:
+        """cached decorator"""
+        state = {"cache": policy(capacity)}
+        lock = threading.Lock()
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            """cached wraps"""
+            if kwargs:
+                key = args + (_KWARGS_MARK,) + tuple(kwargs.items())
+            elif len(args) == 1 and type(args[0]) in (int, str):
+                key = args[0]
+            else:
+                key = args
+            cache = state["cache"]
+            with lock:
+                result = cache.get(key)
+            if result is None:
+                result = fn(*args, **kwargs)
+                with lock:
+                    cache.put(key, _NONE if result is None else result, ttl)
+            elif result is _NONE:
+                result = None
+            return result
+
+        def cache_info() -> Dict:
+            """Counters of the underlying cache"""
+            return state["cache"].stats()
+
+        def cache_clear() -> None:
+            """Empty the cache and reset its counters"""
+            with lock:
+                state["cache"] = wrapper.cache = policy(capacity)
+
+        wrapper.cache = state["cache"]
+        wrapper.cache_info = cache_info
+        wrapper.cache_clear = cache_clear
+        return wrapper
+
+    return decorator